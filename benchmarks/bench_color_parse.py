@@ -0,0 +1,55 @@
+"""Micro-benchmark of the fast path of Color.parse for hex and rgb colors against the RE_COLOR regular expression.
+
+Both paths are timed without the color cache, as colors generated from data are mostly cache misses.
+
+Usage :
+python -m benchmarks.bench_color_parse
+"""
+import random
+from timeit import repeat
+
+from private_utils.dash_components.color import Color, _parse_hex_or_rgb
+
+SAMPLE_SIZE = 10_000
+REPEAT = 5
+
+
+def _random_component() -> int:
+    return random.randint(0, 255)
+
+
+SAMPLES = {
+    '#RRGGBB': [f'#{_random_component():02X}{_random_component():02x}{_random_component():02X}'
+                for _ in range(SAMPLE_SIZE)],
+    '#RRGGBBAA': [f'#{_random_component():02X}{_random_component():02X}{_random_component():02X}'
+                  f'{_random_component():02X}' for _ in range(SAMPLE_SIZE)],
+    '#RGB': [f'#{random.randint(0, 15):X}{random.randint(0, 15):X}{random.randint(0, 15):X}'
+             for _ in range(SAMPLE_SIZE)],
+    'rgb(r,g,b)': [f'rgb({_random_component()},{_random_component()},{_random_component()})'
+                   for _ in range(SAMPLE_SIZE)],
+    'rgba(r,g,b,a)': [f'rgba({_random_component()},{_random_component()},{_random_component()},{random.random():.2f})'
+                      for _ in range(SAMPLE_SIZE)],
+}
+
+
+def _parse_fast(samples):
+    for color_text in samples:
+        Color(*_parse_hex_or_rgb(color_text))
+
+
+def _parse_regex(samples):
+    for color_text in samples:
+        Color._parse_with_regex(color_text)
+
+
+def main():
+    print(f"{'format':<16}{'regex (us)':>12}{'fast (us)':>12}{'speedup':>10}")
+    for name, samples in SAMPLES.items():
+        assert all(Color(*_parse_hex_or_rgb(sample)) == Color._parse_with_regex(sample) for sample in samples)
+        regex = min(repeat(lambda: _parse_regex(samples), number=1, repeat=REPEAT)) / SAMPLE_SIZE * 1e6
+        fast = min(repeat(lambda: _parse_fast(samples), number=1, repeat=REPEAT)) / SAMPLE_SIZE * 1e6
+        print(f"{name:<16}{regex:>12.2f}{fast:>12.2f}{regex / fast:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Micro-benchmark of the construction of components through ComponentFactory, with and without prototype cloning,
+against the direct construction of the Dash component.
+
+Usage :
+python -m benchmarks.bench_component_factory
+"""
+from timeit import repeat
+
+import dash_bootstrap_components as dbc
+from dash import dcc
+
+from private_utils.dash_components import ClassName, ComponentFactory, Spacing
+
+SAMPLE_SIZE = 10_000
+REPEAT = 5
+CLASS_NAME = ClassName().margin(Spacing.extra_small)
+
+CASES = {
+    'dbc.Button': (dbc.Button, dict(className=CLASS_NAME), lambda n: dict(children='Add', id=f'button-{n}')),
+    'dcc.Dropdown': (dcc.Dropdown, dict(className=CLASS_NAME, clearable=False, multi=True),
+                     lambda n: dict(id=f'dropdown-{n}', options=['a', 'b'])),
+}
+
+
+def _construct(factory, call_keywords):
+    for n in range(SAMPLE_SIZE):
+        factory(**call_keywords(n))
+
+
+def main():
+    print(f"{'component':<16}{'direct (us)':>12}{'factory (us)':>14}{'fast (us)':>12}{'speedup':>10}")
+    for name, (base_class, keywords, call_keywords) in CASES.items():
+        factory = ComponentFactory(base_class, **keywords)
+        fast = ComponentFactory(base_class, fast=True, **keywords)
+        assert all(fast(**call_keywords(n)).to_plotly_json() == base_class(**keywords, **call_keywords(n))
+                   .to_plotly_json() for n in range(10))
+
+        timings = [min(repeat(lambda: _construct(function, call_keywords), number=1, repeat=REPEAT)) / SAMPLE_SIZE * 1e6
+                   for function in (lambda **kwargs: base_class(**keywords, **kwargs), factory, fast)]
+        print(f"{name:<16}{timings[0]:>12.2f}{timings[1]:>14.2f}{timings[2]:>12.2f}{timings[0] / timings[2]:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
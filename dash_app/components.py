@@ -1,11 +1,15 @@
 from collections import defaultdict
+from itertools import islice
+from math import fsum
+from operator import itemgetter
 from typing import (TYPE_CHECKING, Any, Callable, Dict, List, Optional,
                     Sequence, Tuple, Union)
 
 import dash_bootstrap_components as dbc
+import numpy as np
 import pandas as pd
 import requests
-from dash import Input, Output, State, ctx, dcc
+from dash import Input, Output, Patch, State, ctx, dcc, no_update
 from dash.dash_table import DataTable
 from dash.exceptions import PreventUpdate
 from dash.html import Div
@@ -13,14 +17,18 @@ from dash.html import Div
 from private_utils.dash_components import (BaseComponent, CallbackDispatcher,
                                            ClassName, ComponentFactory,
                                            FontWeight, LayoutComponent,
-                                           Spacing, Style, generate_uuid)
+                                           PatchMeter, Spacing, Style,
+                                           conditional_color_styles,
+                                           generate_uuid, list_patch,
+                                           records_patch)
+from private_utils.dash_components.color import ColorScale
 
 if TYPE_CHECKING:
     from private_utils.dash_components import DashApp
 
-Button = ComponentFactory(dbc.Button, className=ClassName().margin(Spacing.extra_small))
-Dropdown = ComponentFactory(dcc.Dropdown, className=ClassName().margin(Spacing.extra_small))
-DropdownMenu = ComponentFactory(dbc.DropdownMenu, className=ClassName().margin(Spacing.extra_small))
+Button = ComponentFactory(dbc.Button, fast=True, className=ClassName().margin(Spacing.extra_small))
+Dropdown = ComponentFactory(dcc.Dropdown, fast=True, className=ClassName().margin(Spacing.extra_small))
+DropdownMenu = ComponentFactory(dbc.DropdownMenu, fast=True, className=ClassName().margin(Spacing.extra_small))
 
 # type definition for hinting
 _RecordType = List[Dict[str, Any]]
@@ -72,7 +80,9 @@ class TableWithControls(BaseComponent):
                  include_total: bool = False,
                  total_label: str = 'Total',
                  style_as_list_view=True,
-                 is_open: bool = True):
+                 is_open: bool = True,
+                 color_scale: Optional[ColorScale] = None,
+                 measure_patches: bool = False):
         """Instantiates a new table implementing additional controls such as :
          - Column addition
          - Column duplication
@@ -103,10 +113,16 @@ class TableWithControls(BaseComponent):
             Remove vertical lines from the table.
         is_open :
             Collapsable options are open by default.
+        color_scale :
+            Scale used to color the background of numeric cells according to their value, the text color being
+            adjusted to contrast with it.
+        measure_patches :
+            Measure the bytes saved by the partial updates of the table, see `patch_meter`.
         """
         super().__init__(component_id=component_id, app=app)
 
         self.include_total = include_total
+        self.color_scale = color_scale
         self.total_label = total_label
         self.index_id = index_id
         self.new_col_format = new_col_format
@@ -116,27 +132,22 @@ class TableWithControls(BaseComponent):
         self.converter = TableFormatConverter(index_id=index_id,
                                               total_label=total_label,
                                               default_columns_options=self._default_columns_options)
+        self.totals = ColumnTotals(index_id=index_id, total_label=total_label)
+        self.patch_meter = PatchMeter(enabled=measure_patches)
 
         columns_order = list(columns_names.keys())
         columns = self.converter.columns_names_to_datatable_columns(columns_names, columns_order)
         self.columns_order = dcc.Store(id=self.generate_id('columns_order'), data=columns_order)
-        records = self.validate_table_records(records, columns)
-
-        style_data_conditional = []
-        if include_total:
-            total_condition = (Style({'if': {'filter_query': f"{{{self.index_id}}} = {total_label}"}})
-                               .font_weight(FontWeight.bold))
-            style_data_conditional.append(total_condition)
 
         style_cell_conditional = [Style({'if': {'column_id': f'{self.index_id}'}}).text_align('left')]
 
         self.table = DataTable(id=self.generate_id('table'),
-                               data=records, columns=columns,
-                               style_header=Style().background('whitesmoke').font_weight(FontWeight.bold),
-                               style_data_conditional=style_data_conditional,
+                               columns=columns,
+                               style_header=Style().background('whitesmoke').font_weight(FontWeight.bold).freeze(),
                                style_cell_conditional=style_cell_conditional,
                                style_as_list_view=style_as_list_view,
                                editable=editable)
+        self.set_records(records)
 
         # Defines options for the table.
         self.add_column_button = Button('Add new', id=self.generate_id('add_column_button'), n_clicks=0)
@@ -163,7 +174,10 @@ class TableWithControls(BaseComponent):
                        include_total: bool = False,
                        total_label: str = 'Total',
                        style_as_list_view: bool = True,
-                       is_open: bool = True) -> 'TableWithControls':
+                       is_open: bool = True,
+                       color_scale: Optional[ColorScale] = None,
+                       measure_patches: bool = False,
+                       read_records: bool = True) -> 'TableWithControls':
         """Instantiate the Table from an initial csv file.
 
         Parameters
@@ -186,13 +200,19 @@ class TableWithControls(BaseComponent):
             Remove vertical lines from the table.
         is_open :
             Collapsable options are opened by default.
+        color_scale :
+            Scale used to color the background of numeric cells according to their value.
+        measure_patches :
+            Measure the bytes saved by the partial updates of the table.
+        read_records :
+            Read the records at once, otherwise only the columns are read and the table is empty until `load_file`.
 
         Returns
         -------
         TableWithControls
 
         """
-        dataframe = pd.read_csv(file_path).apply(pd.to_numeric, errors='ignore')
+        dataframe = _to_numeric_columns(pd.read_csv(file_path, nrows=None if read_records else 0))
         columns_names = {generate_uuid(): column for column in dataframe.columns}
 
         dataframe.columns = pd.Index(columns_names.keys())
@@ -205,9 +225,37 @@ class TableWithControls(BaseComponent):
                        editable=editable,
                        include_total=include_total,
                        total_label=total_label,
-                       style_as_list_view=style_as_list_view)
+                       style_as_list_view=style_as_list_view,
+                       is_open=is_open,
+                       color_scale=color_scale,
+                       measure_patches=measure_patches)
         return instance
 
+    def set_records(self, records: _RecordType) -> None:
+        """Set the records displayed by the table, validated and styled as the edited ones.
+
+        Parameters
+        ----------
+        records :
+            Data to display in the record (list of dictionary) format, with the columns of the table.
+        """
+        records = self.validate_table_records(records, self.table.columns)
+        self.table.data = records
+        self.table.style_data_conditional = self.style_data_conditional(records, self.table.columns)
+
+    def load_file(self, file_path: str) -> None:
+        """Set the records of the table from a csv file with the same columns, e.g. the one it was instantiated from
+        without reading its records.
+
+        Parameters
+        ----------
+        file_path :
+            File path to load the records from.
+        """
+        dataframe = _to_numeric_columns(pd.read_csv(file_path))
+        dataframe.columns = pd.Index(self.columns_order.data)
+        self.set_records(TableFormatConverter.dataframe_to_records(dataframe))
+
     def _filter_records(self, records) -> _RecordType:
         """Remove total label from the records."""
         return [record for record in records if record[self.index_id] != self.total_label]
@@ -216,7 +264,11 @@ class TableWithControls(BaseComponent):
             -> Tuple[str, _ColumnsType, List[str]]:
         """Append a new empty column to the existing table control."""
         new_column_name = self.new_col_format.format(n)
-        new_id = generate_uuid()
+        # ids generated by other workers may already be in the table
+        existing_ids = {column['id'] for column in columns}
+        new_id = generate_uuid(self.component_id)
+        while new_id in existing_ids:
+            new_id = generate_uuid(self.component_id)
         columns.append({'id': new_id, 'name': new_column_name, **self._default_columns_options})
         columns_order.append(new_id)
         return new_id, columns, columns_order
@@ -283,45 +335,72 @@ class TableWithControls(BaseComponent):
         records = self._duplicate_records_table(source_id, new_id, records)
         return columns, columns_order, options, records
 
-    def validate_table_records(self, records: _RecordType, columns: _ColumnsType) -> _RecordType:
+    def validate_table_records(self, records: _RecordType, columns: _ColumnsType,
+                               previous_records: Optional[_RecordType] = None) -> _RecordType:
         """Validate records from the table.
 
-        If include_total is ```True``` then the sum of each column is computed.
+        If include_total is ```True``` then the sum of each numeric column is computed, incrementally from the rows
+        edited since the previous records when they are given, see ColumnTotals.
         Parameters
         ----------
         records :
             Current values in the table.
         columns :
             Current definitions of the columns.
+        previous_records :
+            Values of the table before the last edit, i.e. its `data_previous` property.
 
         Returns
         -------
         Validated records.
 
         """
-        """ """
         if self.include_total:
-            columns_names, columns_type = dict(), dict()
+            numeric_ids = [column['id'] for column in columns
+                           if column['id'] != self.index_id and column.get('type') == 'numeric']
+            records = self.totals.apply(records, numeric_ids, previous_records)
+            # the other columns are not aggregated, their total is the sum of no value
             for column in columns:
-                col_id, col_name, col_type = column['id'], column['name'], column['type']
-                columns_names[col_id], columns_type[col_id] = col_name, col_type
-
-            # remove total from records
-            records = self._filter_records(records)
-            # compute sum
-            total = {key: sum([self._get_value_from_record(record, key)
-                               for record in records if columns_type[key] == 'numeric'])
-                     for key in columns_names.keys()}
-            total[self.index_id] = self.total_label
-            records.append(total)
+                records[-1].setdefault(column['id'], 0)
         return records
 
-    @staticmethod
-    def _get_value_from_record(record, key) -> Union[float, int]:
-        value = record.get(key, 0)
-        if value is None or value == '':
-            return 0
-        return value
+    def style_data_conditional(self, records: _RecordType, columns: _ColumnsType) -> List[Style]:
+        """Conditional styles of the table cells.
+
+        The total row is displayed in bold. If a color scale is defined, the background of numeric cells is colored
+        according to their value, and their text color is chosen to contrast with it. Colors of all the cells are
+        computed at once.
+        Parameters
+        ----------
+        records :
+            Current values in the table.
+        columns :
+            Current definitions of the columns.
+
+        Returns
+        -------
+        Styles in the format expected by the `style_data_conditional` property of Dash DataTable.
+
+        """
+        styles = []
+        if self.include_total:
+            styles.append(Style({'if': {'filter_query': f"{{{self.index_id}}} = {self.total_label}"}})
+                          .font_weight(FontWeight.bold))
+
+        if self.color_scale is not None:
+            numeric_ids = [column['id'] for column in columns
+                           if column['id'] != self.index_id and column.get('type') == 'numeric']
+            conditions, values = [], []
+            for row_index, record in enumerate(records):
+                if record.get(self.index_id) == self.total_label:
+                    continue
+                for column_id in numeric_ids:
+                    value = record.get(column_id)
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        conditions.append({'row_index': row_index, 'column_id': column_id})
+                        values.append(value)
+            styles.extend(conditional_color_styles(conditions, self.color_scale.map(values)))
+        return styles
 
     def layout(self) -> Div:
         """Defines the layout."""
@@ -395,7 +474,7 @@ class TableWithControls(BaseComponent):
         #         return Result(records=records)
         #
         #     raise PreventUpdate
-        with CallbackDispatcher(self.app) as dispatcher:
+        with CallbackDispatcher(self.app, split=True) as dispatcher:
             @dispatcher.callback(Output(self.table, 'columns'),
                                  Output(self.columns_order, 'data'),
                                  Output(self.duplicate_dropdown, 'options'),
@@ -409,8 +488,9 @@ class TableWithControls(BaseComponent):
                 if add_column_click:
                     columns, columns_order, options = \
                         self.add_new_column(columns_created, current_columns, current_columns_order)
-                    # records = self.validate_table_records(records, columns)
-                    return columns, columns_order, options, columns_created + 1
+                    # only the new column is sent, the browser has the others
+                    return (*(self.patch_meter.record(_append_patch(values[-1]), values)
+                              for values in (columns, columns_order, options)), columns_created + 1)
                 raise PreventUpdate
 
             @dispatcher.callback(Output(self.table, 'columns'),
@@ -419,6 +499,7 @@ class TableWithControls(BaseComponent):
                                  Output(self.columns_created, 'data'),
                                  Output(self.table, 'data'),
                                  Output(self.duplicate_dropdown, 'value'),
+                                 Output(self.table, 'style_data_conditional'),
                                  Input(self.duplicate_dropdown, 'value'),
                                  State(self.table, 'data'),
                                  State(self.table, 'columns'),
@@ -429,18 +510,50 @@ class TableWithControls(BaseComponent):
                                   current_columns: _ColumnsType,
                                   current_columns_order: List[str],
                                   columns_created: int, ):
+                rows_count = len(records)
+                in_place = not self.include_total or (records and records[-1].get(self.index_id) == self.total_label)
                 columns, columns_order, options, records = \
                     self.duplicate_column(columns_created, current_columns, current_columns_order,
                                           duplicate_choice_id, records)
                 records = self.validate_table_records(records, columns)
-                return columns, columns_order, options, columns_created + 1, records, None
+                styles = self.style_data_conditional(records, columns) if self.color_scale is not None else no_update
+
+                data = records
+                if in_place and len(records) == rows_count:
+                    # rows are at the same positions as in the browser, only the new column and the total are sent
+                    new_id = columns_order[-1]
+                    cells = [(position, new_id) for position, record in enumerate(records) if new_id in record]
+                    if self.include_total:
+                        cells.extend((rows_count - 1, key) for key in records[-1])
+                    data = records_patch(records, cells)
+                columns_update, columns_order_update, options_update = (
+                    self.patch_meter.record(_append_patch(values[-1]), values)
+                    for values in (columns, columns_order, options))
+                data = self.patch_meter.record(data, records)
+                return (columns_update, columns_order_update, options_update, columns_created + 1, data, None,
+                        styles)
 
             @dispatcher.callback(Output(self.table, 'data'),
+                                 Output(self.table, 'style_data_conditional'),
                                  Input(self.table, 'data'),
-                                 State(self.table, 'columns'))
-            def _update_data(records: _RecordType, current_columns: _ColumnsType):
-                records = self.validate_table_records(records, current_columns)
-                return records
+                                 State(self.table, 'columns'),
+                                 State(self.table, 'data_previous'))
+            def _update_data(records: _RecordType, current_columns: _ColumnsType,
+                             previous_records: Optional[_RecordType]):
+                source, total = records, records[-1] if records else {}
+                records = self.validate_table_records(records, current_columns, previous_records)
+                styles = self.style_data_conditional(records, current_columns) \
+                    if self.color_scale is not None else no_update
+
+                if records is not source:
+                    # the total row was added or moved
+                    return self.patch_meter.record(records, records), styles
+                # edited cells are already in the browser, only the updated totals are sent
+                cells = [(len(records) - 1, key) for key, value in records[-1].items()
+                         if total.get(key) != value] if records else []
+                if not cells:
+                    return no_update, styles
+                return self.patch_meter.record(records_patch(records, cells), records), styles
 
 
 class ApiResultsStore(BaseComponent):
@@ -493,7 +606,7 @@ class LinkedTable(BaseComponent):
     def __init__(self, app: 'DashApp', component_id: str,
                  column_source_control, column_source_property,
                  data_source_control, data_source_property,
-                 style_cell_conditional):
+                 style_cell_conditional, measure_patches: bool = False):
         """Instantiates a new LinkedTable control.
 
         Parameters
@@ -504,8 +617,11 @@ class LinkedTable(BaseComponent):
             Base unique id to use for all controls defined in that component.
         linked :
             Reference to the table to link
+        measure_patches :
+            Measure the bytes saved by the partial updates of the table, see `patch_meter`.
         """
         super().__init__(app=app, component_id=component_id)
+        self.patch_meter = PatchMeter(enabled=measure_patches)
 
         self.column_source_control = column_source_control
         self.column_source_property = column_source_property
@@ -517,7 +633,7 @@ class LinkedTable(BaseComponent):
         # style_cell_conditional=table_component.style_cell_conditional
         columns = getattr(column_source_control, column_source_property)
         self.table = DataTable(columns=columns,
-                               style_header=Style().background('whitesmoke').font_weight(FontWeight.bold),
+                               style_header=Style().background('whitesmoke').font_weight(FontWeight.bold).freeze(),
                                style_cell_conditional=style_cell_conditional)
 
     def layout(self) -> Div:
@@ -527,15 +643,20 @@ class LinkedTable(BaseComponent):
     def register_callbacks(self):
         """Register callbacks."""
 
+        # the current values are uploaded so that only their differences with the sources are sent back
         @self.app.callback(Output(self.table, 'columns'),
-                           Input(self.column_source_control, self.column_source_property))
-        def _synchronize_columns(columns: _ColumnsType) -> _ColumnsType:
-            return columns
+                           Input(self.column_source_control, self.column_source_property),
+                           State(self.table, 'columns'))
+        def _synchronize_columns(columns: _ColumnsType, current_columns: Optional[_ColumnsType]):
+            return self.patch_meter.record(list_patch(current_columns, columns), columns)
 
         @self.app.callback(Output(self.table, 'data'),
-                           Input(self.data_source_control, self.data_source_property))
-        def _synchronize_data(records):
-            return records
+                           Input(self.data_source_control, self.data_source_property),
+                           State(self.table, 'data'))
+        def _synchronize_data(records: Optional[_RecordType], current_records: Optional[_RecordType]):
+            if records is None:
+                return records
+            return self.patch_meter.record(list_patch(current_records, records), records)
 
         # @self.app.callback(Output(self.table, 'data'),
         #                    Input(self.linked.table, 'data'))
@@ -548,6 +669,204 @@ class LinkedTable(BaseComponent):
         #     raise PreventUpdate
 
 
+def _to_numeric_columns(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Convert the columns of the dataframe to numbers, the columns which are not numeric being kept as is."""
+    for column in dataframe.columns:
+        try:
+            dataframe[column] = pd.to_numeric(dataframe[column])
+        except (TypeError, ValueError):
+            pass
+    return dataframe
+
+
+def _append_patch(item) -> Patch:
+    """Patch appending the item to a list property."""
+    patch = Patch()
+    patch.append(item)
+    return patch
+
+
+def _to_float(value) -> float:
+    """Numeric value of a cell, empty and invalid cells counting as 0."""
+    if value is None or value == '':
+        return 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _to_number(value: float, decimals: Optional[int] = None) -> Union[float, int]:
+    """JSON friendly number, rounded to the decimals if given, integral values being shown without decimals."""
+    value = float(value)
+    if decimals is not None:
+        value = round(value, decimals)
+    return int(value) if value.is_integer() else value
+
+
+# floats have 15 to 17 significant digits, beyond which the rounding errors of a sum are not distinguishable
+_MAX_DECIMALS = 15
+
+
+def _decimals(value: float) -> int:
+    """Number of decimals of the shortest representation of a float, e.g. 2 for 0.25 or 0 for 1e3."""
+    mantissa, _, exponent = repr(float(value)).partition('e')
+    fraction = mantissa.partition('.')[2].rstrip('0')
+    return min(max(len(fraction) - int(exponent or 0), 0), _MAX_DECIMALS)
+
+
+def _columns_decimals(values: np.ndarray) -> np.ndarray:
+    """Number of decimals of the values of each column, i.e. the fewest decimals they are unchanged rounded to."""
+    decimals = np.full(values.shape[1], _MAX_DECIMALS)
+    pending = np.arange(values.shape[1])
+    for count in range(_MAX_DECIMALS):
+        columns = values[:, pending]
+        exact = (np.round(columns, count) == columns).all(axis=0)
+        decimals[pending[exact]] = count
+        pending = pending[~exact]
+        if not pending.size:
+            break
+    return decimals
+
+
+class ColumnTotals:
+    """Total row of a table, updated incrementally from the rows edited since the previous data of the table.
+
+    The total row is the last record, labelled with `total_label` in the index column. When the previous records
+    have the same rows and columns as the current ones, their total row is updated from the edited rows only, as
+    given by the `data_previous` property of a DataTable. Otherwise, e.g. when a row or a column is added, or when
+    many rows are edited at once, the totals are computed over the whole table with NumPy.
+
+    Sums are rounded to the decimals of their cells, so that the rounding errors of floats do not build up over the
+    incremental updates, e.g. 72.1 instead of 72.09999999999994. Means are always computed over the whole table, as
+    the decimals of the sum they are updated from are not known.
+
+    Example :
+    totals = ColumnTotals(index_id='name', total_label='Total')
+    records = totals.apply(records, ['price', 'quantity'], previous_records)
+    """
+
+    AGGREGATES = {'sum': np.sum, 'mean': np.mean, 'min': np.min, 'max': np.max}
+
+    def __init__(self, index_id: str, total_label: str, aggregate: str = 'sum', full_update_ratio: float = 0.1):
+        """Instantiates the totals of a table.
+
+        Parameters
+        ----------
+        index_id :
+            Identifier of the index column.
+        total_label :
+            Label of the total row in the index column.
+        aggregate :
+            Aggregate of the columns in the total row, one of `sum`, `mean`, `min` or `max`.
+        full_update_ratio :
+            Ratio of edited rows above which the totals are computed over the whole table.
+        """
+        if aggregate not in self.AGGREGATES:
+            raise ValueError(f"Expected one of {', '.join(self.AGGREGATES)}, got {aggregate}")
+        self.index_id = index_id
+        self.total_label = total_label
+        self.aggregate = aggregate
+        self.full_update_ratio = full_update_ratio
+
+    def _is_total(self, record) -> bool:
+        return record.get(self.index_id) == self.total_label
+
+    def apply(self, records: _RecordType, numeric_ids: List[str],
+              previous_records: Optional[_RecordType] = None) -> _RecordType:
+        """Append the total row to the records, or refresh it in place.
+
+        Parameters
+        ----------
+        records :
+            Current values in the table.
+        numeric_ids :
+            Identifiers of the aggregated columns.
+        previous_records :
+            Values of the table before the last edit, with their total row.
+
+        Returns
+        -------
+        The records, with their total row last.
+        """
+        if not records or not self._is_total(records[-1]):
+            # the total row is missing, or was moved
+            records = [record for record in records if not self._is_total(record)]
+            records.append({})
+            previous_records = None
+
+        total = None
+        if previous_records is not None:
+            total = self._update(records, numeric_ids, previous_records)
+        if total is None:
+            total = self._compute(records, numeric_ids)
+        total[self.index_id] = self.total_label
+        records[-1] = total
+        return records
+
+    def _compute(self, records: _RecordType, numeric_ids: List[str]) -> Dict[str, Any]:
+        """Aggregate the columns over all the rows, the total row excepted."""
+        rows_count = len(records) - 1
+        if not rows_count or not numeric_ids:
+            return {key: 0 if self.aggregate == 'sum' else None for key in numeric_ids}
+        get = itemgetter(*numeric_ids)
+        try:
+            # empty cells are None, converted to nan
+            values = np.array([get(record) for record in islice(records, rows_count)], dtype=float)
+        except (KeyError, TypeError, ValueError):
+            # missing or invalid cells, converted column by column
+            values = np.column_stack([self._column_values(records, rows_count, key) for key in numeric_ids])
+        values = np.nan_to_num(values.reshape(rows_count, len(numeric_ids)), nan=0.0)
+        totals = self.AGGREGATES[self.aggregate](values, axis=0)
+        if self.aggregate == 'sum':
+            return {key: _to_number(value, int(decimals))
+                    for key, value, decimals in zip(numeric_ids, totals, _columns_decimals(values))}
+        return {key: _to_number(value) for key, value in zip(numeric_ids, totals)}
+
+    @staticmethod
+    def _column_values(records: _RecordType, rows_count: int, key: str) -> np.ndarray:
+        cells = [record.get(key) for record in islice(records, rows_count)]
+        try:
+            return np.array(cells, dtype=float)
+        except (TypeError, ValueError):
+            return np.array([_to_float(cell) for cell in cells])
+
+    def _update(self, records: _RecordType, numeric_ids: List[str],
+                previous_records: _RecordType) -> Optional[Dict[str, Any]]:
+        """Update the previous total row from the edited rows, or returns None if it can't be."""
+        rows_count = len(records) - 1
+        if self.aggregate == 'mean':
+            return None
+        if len(previous_records) != len(records) or not self._is_total(previous_records[-1]):
+            return None
+        previous_total = previous_records[-1]
+        # rows are compared as dictionaries, far cheaper than aggregating their cells
+        edited = [position for position in range(rows_count) if records[position] != previous_records[position]]
+        if len(edited) > self.full_update_ratio * rows_count:
+            return None
+
+        total = {}
+        for key in numeric_ids:
+            value = previous_total.get(key)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                # new column
+                return None
+            old = [_to_float(previous_records[position].get(key)) for position in edited]
+            new = [_to_float(records[position].get(key)) for position in edited]
+            decimals = None
+            if self.aggregate == 'sum':
+                # the sum of the other rows has at most the decimals of the total and of the old cells
+                decimals = max(map(_decimals, [value, *old, *new]))
+                value = fsum([value, *new, *(-cell for cell in old)])
+            elif value in old:
+                # the extremum may have been edited
+                return None
+            else:
+                value = min([value, *new]) if self.aggregate == 'min' else max([value, *new])
+            total[key] = _to_number(value, decimals)
+        return total
+
+
 class TableFormatConverter:
     """Object converting the columns or data from one format to another."""
 
@@ -1,16 +1,17 @@
 import dash_bootstrap_components as dbc
-from dash.dcc import Location
 from main_page import MainPage
 from sidebar import SideBar
 
-from private_utils.dash_components import DashApp
+from private_utils.dash_components import DashApp, HierarchicalIds
 
 dbc_css = ("https://cdn.jsdelivr.net/gh/AnnMarieW/dash-bootstrap-templates@V1.0.2/dbc.min.css")
-app = DashApp(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP, dbc_css])
+# the ids of the pages must be the same in every worker
+app = DashApp(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP, dbc_css], compile_styles=True,
+              trace_callbacks=True, id_strategy=HierarchicalIds())
 nav_bar = SideBar(component_id='side_bar')
-main_page = MainPage(component_id='main_page', file_path='./dummy.csv', app=app)
+app.register_page('/', MainPage, component_id='main_page', file_path='./dummy.csv')
 
-app.layout = dbc.Container([Location(id="url"), nav_bar, main_page], fluid=True, className='dbc')
+app.layout = dbc.Container([nav_bar, *app.page_container(location_id='url')], fluid=True, className='dbc')
 
 if __name__ == '__main__':
     app.run_server(debug=True)
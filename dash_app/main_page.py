@@ -9,6 +9,8 @@ class MainPage(BaseComponent):
 
     def __init__(self, app, file_path: str, component_id: str = None):
         super().__init__(component_id=component_id, app=app)
+        self.file_path = file_path
+        # only the columns are read, the records are read by load on the first visit of the page
         self.first_table = (TableWithControls.
                             from_file_path(component_id=self.generate_id('main_table'),
                                            app=app,
@@ -16,7 +18,8 @@ class MainPage(BaseComponent):
                                            include_total=True,
                                            editable=True,
                                            style_as_list_view=False,
-                                           is_open=True))
+                                           is_open=True,
+                                           read_records=False))
         self.api_store = ApiResultsStore(component_id=self.generate_id('api'),
                                          app=app,
                                          source_control=self.first_table.table,
@@ -33,6 +36,10 @@ class MainPage(BaseComponent):
 
         self.modal = Modal(component_id='modal')
 
+    def load(self):
+        """Read the records of the table, called by the page before its first layout."""
+        self.first_table.load_file(self.file_path)
+
     def layout(self):
         """Register layout."""
         hidden = Div([self.api_store])
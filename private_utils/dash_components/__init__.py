@@ -1,3 +1,8 @@
 from .base import *
+from .cache import *
 from .callback import *
+from .ids import *
+from .metrics import *
+from .patch import *
 from .style import *
+from .stylesheet import *
@@ -1,46 +1,485 @@
-from functools import update_wrapper
-from typing import Iterable, Optional
-from uuid import uuid4
-
-from dash import Dash
+import gzip
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from copy import copy
+from functools import partial, update_wrapper, wraps
+from hashlib import md5
+from inspect import signature
+from threading import Lock, local
+from time import perf_counter
+from typing import (Any, Callable, Dict, Hashable, Iterator, List,
+                    MutableMapping, MutableSet, NamedTuple, Optional, Tuple,
+                    Type)
+from urllib.parse import urlencode
+from weakref import WeakKeyDictionary, WeakSet
+
+from dash import Dash, Input, Output, html
+from dash._utils import to_json
+from dash.dcc import Location
+from dash.development.base_component import Component
 # from dash_extensions.enrich import DashProxy
+from flask import Response, g, has_request_context, request
 from structlog import getLogger
 
+from .cache import Cache
+from .callback import CallbackBatcher
+from .ids import (IdStrategy, _construction_stack, generate_uuid,
+                  set_id_strategy)
+from .metrics import CallbackMetrics
+from .style import ClassName, FrozenStyle, Style
+from .stylesheet import StyleSheet
+
 logger = getLogger(__name__)
 
-__all__ = ['LayoutComponent', 'BaseComponent', 'DashApp', 'ComponentFactory', 'generate_uuid']
+__all__ = ['LayoutComponent', 'BaseComponent', 'DashApp', 'ComponentFactory', 'LayoutWalker', 'WalkStats', 'LazyPage',
+           'StartupProfiler', 'ProfileRecord']
+
+
+STYLE_SHEET_ROUTE = '_compiled-styles.css'
+METRICS_ROUTE = '_metrics'
+# properties whose value set by a callback would override, or drop, a compiled style
+STYLE_PROPERTIES = ('style', 'className')
+
+
+class SerializedLayout(NamedTuple):
+    """Layout encoded once for all the `_dash-layout` requests."""
 
+    body: bytes
+    """JSON encoded layout"""
+    gzipped: bytes
+    """Gzip compressed body"""
+    etag: str
+    """Hash of the body"""
 
-def generate_uuid() -> str:
-    """Generate unique id."""
-    return str(uuid4())
+    @classmethod
+    def from_layout(cls, layout) -> 'SerializedLayout':
+        body = to_json(layout).encode()
+        return cls(body, gzip.compress(body), md5(body).hexdigest())
 
 
 class DashApp(Dash):
-    """Subclass of Dash application. It mainly allows to use BaseComponent as if it was a component from Dash."""
+    """Subclass of Dash application. It mainly allows to use BaseComponent as if it was a component from Dash.
+
+    The layout is resolved by `layout_walker`, whose `last_stats` report the duration and size of the last walk.
+
+    With `compile_styles=True`, the inline Style of the components are hoisted into the css classes of a stylesheet
+    served by the application, so that identical styles are only sent once instead of once per component. The styles
+    of the components whose style or className is updated by a callback stay inline, hence the layout must be assigned
+    after the callbacks are registered.
+
+    The layout can also be a function, called and walked on each page load. With a `layout_cache_key`, the walked
+    layouts are stored in `layout_cache`, so that repeat visitors get the same layout without rebuilding it. Styles of
+    function layouts are not compiled, as the stylesheet is requested before the layout. A function layout may create
+    Dash components and LayoutComponent, but the BaseComponent it displays must be built beforehand, e.g. one per
+    tenant: their callbacks would otherwise be registered again on each call, hence registering a callback during the
+    call raises a RuntimeError.
+
+    Other layouts are serialized and compressed only once, on the first page load after their assignment.
+
+    Pages registered with `register_page` are instantiated, and their callbacks registered, on registration, but only
+    loaded and walked on their first visit, their styles being compiled in a stylesheet of their own, see
+    `page_container`.
+
+    The ids of the components created without one are generated by `id_strategy`, random uuids by default. With
+    `id_strategy=HierarchicalIds()`, they are short and the same in every worker, as needed by the pages.
+
+    With `trace_callbacks=True`, the calls of every callback are measured in `callback_metrics`, the sub-callbacks of a
+    CallbackDispatcher or a CallbackBatcher being measured on their own, and exported in the Prometheus text format at
+    `/_metrics`.
+
+    Example :
+    app = DashApp(__name__, layout_cache_key=lambda: flask.session.get('tenant'),
+                  layout_cache=Cache(maxsize=256, ttl=600))
+    tenant_pages = {tenant: TenantPage(app, tenant) for tenant in TENANTS}
+    app.layout = lambda: html.Div([nav_bar, tenant_pages[flask.session['tenant']]])
+    """
+
+    def __init__(self, *args, compile_styles: bool = False,
+                 layout_cache_key: Optional[Callable[[], Optional[Hashable]]] = None,
+                 layout_cache: Optional[Cache] = None, id_strategy: Optional[IdStrategy] = None,
+                 trace_callbacks: bool = False, **kwargs):
+        """Instantiates a new application, the other arguments are passed to Dash.
+
+        Parameters
+        ----------
+        compile_styles :
+            Whether the inline Style of the components are hoisted into a stylesheet.
+        layout_cache_key :
+            Function returning the key of the layout for the current request, e.g. the user or the tenant, called
+            when the layout is a function. A key of None bypasses the cache.
+        layout_cache :
+            Cache of the function layouts. Defaults to 128 layouts kept for 5 minutes.
+        id_strategy :
+            Strategy generating the missing ids of the components, e.g. HierarchicalIds(). Set for the whole
+            process, hence the application must be created before its components.
+        trace_callbacks :
+            Whether the duration, payload sizes, PreventUpdate and errors of the callbacks are measured.
+        """
+        if id_strategy is not None:
+            set_id_strategy(id_strategy)
+        # set before Dash.__init__, which calls init_app
+        self.style_sheet = StyleSheet() if compile_styles else None
+        self.layout_walker = LayoutWalker()
+        self.layout_cache_key = layout_cache_key
+        self.layout_cache = layout_cache if layout_cache is not None else Cache(maxsize=128, ttl=300)
+        self._serialized_layout: Optional[SerializedLayout] = None
+        self.pages: Dict[str, LazyPage] = {}
+        self.callback_batcher = CallbackBatcher(self)
+        self.callback_metrics = CallbackMetrics() if trace_callbacks else None
+        # whether a function layout is being called in the current thread
+        self._calling_layout = local()
+        super().__init__(*args, **kwargs)
+        if self.style_sheet is not None:
+            url = self.config.requests_pathname_prefix + STYLE_SHEET_ROUTE
+            self.config.external_stylesheets = [*self.config.external_stylesheets, url]
+
+    def init_app(self, app=None, **kwargs):
+        super().init_app(app, **kwargs)
+        route = self.config.routes_pathname_prefix + STYLE_SHEET_ROUTE
+        if self.style_sheet is not None and route not in self.routes:
+            self._add_url(STYLE_SHEET_ROUTE, self.serve_style_sheet)
+        if self.callback_metrics is not None and self.config.routes_pathname_prefix + METRICS_ROUTE not in self.routes:
+            self._add_url(METRICS_ROUTE, self.serve_metrics)
+            self.server.after_request(self._record_callback_payload)
+
+    def callback(self, *args, **kwargs):
+        """Register a callback as Dash does, traced when `trace_callbacks` is set."""
+        if getattr(self._calling_layout, 'active', False):
+            raise RuntimeError("A callback was registered by a function layout, which is called on each page load. "
+                               "Build the components with callbacks before assigning the layout, and only reuse them "
+                               "in the function.")
+        register = super().callback(*args, **kwargs)
+        if self.callback_metrics is None:
+            return register
+
+        def wrapper(function):
+            register(self.callback_metrics.trace(function))
+            return function
+
+        return wrapper
+
+    def register_page(self, pathname: str, component_class: Type['LayoutComponent'], **kwargs) -> 'LazyPage':
+        """Register the component displayed at the pathname.
+
+        The component is instantiated at once, so that its callbacks are registered in every worker: only its `load`
+        method and its layout are deferred to its first visit, see LazyPage. Hence a page doing costly work in its
+        `__init__` is not lazy, and should move that work to `load`.
+
+        Parameters
+        ----------
+        pathname :
+            Path of the page, relative to the prefix of the application, e.g. `/page-1`.
+        component_class :
+            LayoutComponent or BaseComponent class of the page. `app` is passed to the BaseComponent.
+        kwargs :
+            Arguments of the component. The component_id defaults to one derived from the pathname, so that the ids
+            are the same in all the workers.
+
+        Returns
+        -------
+        The registered page.
+        """
+        key = pathname.strip('/')
+        kwargs.setdefault('component_id', f"page_{key.replace('/', '_') or 'index'}")
+        if issubclass(component_class, BaseComponent):
+            kwargs.setdefault('app', self)
+        # the components of the pages are not all in the layout
+        self.config.suppress_callback_exceptions = True
+        page = self.pages[key] = LazyPage(component_class, **kwargs)
+        if self.style_sheet is not None:
+            page.style_sheet = StyleSheet()
+        page.instantiate()
+        return page
+
+    def page_container(self, location_id: str = 'url', container_id: str = 'page-content') -> list:
+        """Returns the components displaying the registered pages, and register their router callback.
+
+        The callbacks of the pages are registered with them, hence known to the browser whichever page it reaches
+        first. A page is loaded and walked on its first display only. With `compile_styles=True`, its styles are
+        compiled in its own stylesheet, linked with its layout, which any worker can serve by loading that page only.
+        """
+
+        @self.callback(Output(container_id, 'children'), Input(location_id, 'pathname'))
+        def route(pathname):
+            key = self.strip_relative_path(pathname) or ''
+            page = self.pages.get(key)
+            if page is None:
+                return html.Div(f"Page {pathname} not found.")
+            layout = self._page_layout(page)
+            if page.style_sheet is None:
+                return layout
+            href = self.config.requests_pathname_prefix + STYLE_SHEET_ROUTE + '?' + urlencode({'page': key})
+            return [html.Link(rel='stylesheet', href=href), layout]
+
+        return [Location(id=location_id), html.Div(id=container_id)]
 
     @Dash.layout.setter
     def layout(self, layout):
         # subclass the property setter of Dash.
-        layout = _walk_layout(layout)
+        self._serialized_layout = None
+        if callable(layout):
+            self.layout_cache.clear()
+            layout = self._walk_per_request(layout)
+        else:
+            layout = self._walk_and_compile(layout)
         Dash.layout.fset(self, layout)
 
+    def _walk_and_compile(self, layout, style_sheet: Optional[StyleSheet] = None):
+        layout = self.layout_walker.walk(layout)
+        style_sheet = self.style_sheet if style_sheet is None else style_sheet
+        if style_sheet is not None:
+            layout = style_sheet.compile(layout, *self._style_outputs())
+        return layout
+
+    def _page_layout(self, page: 'LazyPage'):
+        """Returns the layout of the page, loaded, walked and compiled in its own stylesheet on the first call."""
+        return page.layout(partial(self._walk_and_compile, style_sheet=page.style_sheet))
+
+    def _walk_per_request(self, function: Callable):
+        """Wrap a function layout so that its result is walked, and cached if the request has a key."""
+
+        def build():
+            self._calling_layout.active = True
+            try:
+                return self.layout_walker.walk(function())
+            finally:
+                self._calling_layout.active = False
+
+        @wraps(function)
+        def layout():
+            key = None
+            if self.layout_cache_key is not None and has_request_context():
+                key = self.layout_cache_key()
+            if key is None:
+                return build()
+            return self.layout_cache.get_or_compute(key, build)
+
+        return layout
+
+    def serve_layout(self):
+        """Serve the layout from its serialized bytes, gzipped if the browser accepts it."""
+        if self._layout_is_function:
+            return super().serve_layout()
+        serialized = self._serialized_layout
+        if serialized is None:
+            serialized = self._serialized_layout = SerializedLayout.from_layout(self.get_layout())
+
+        if request.if_none_match.contains(serialized.etag):
+            return Response(status=304)
+        if request.accept_encodings['gzip']:
+            response = Response(serialized.gzipped, mimetype='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = Response(serialized.body, mimetype='application/json')
+        response.set_etag(serialized.etag)
+        response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    def _style_outputs(self) -> tuple[set, bool]:
+        """Returns the identifiers of the components whose style or className is a callback output, and whether a
+        pattern-matching callback outputs one of them."""
+        component_ids, pattern_matching = set(), False
+        for outputs in self.callback_map:
+            # multiple outputs are formatted as `..id.prop...id.prop..`, duplicate ones as `id.prop@hash`
+            for output in outputs.strip('.').split('...'):
+                component_id, _, prop = output.rpartition('.')
+                if prop.partition('@')[0] in STYLE_PROPERTIES:
+                    pattern_matching |= component_id.startswith('{')
+                    component_ids.add(component_id)
+        return component_ids, pattern_matching
+
+    def serve_style_sheet(self):
+        """Serve the compiled styles, revalidated by the browser through their etag.
+
+        The styles of a page, requested with its key as `page` argument, are compiled from its layout if it was not
+        displayed by this worker yet, without loading the other pages.
+        """
+        style_sheet = self.style_sheet
+        key = request.args.get('page')
+        if key is not None:
+            page = self.pages.get(key)
+            if page is None or page.style_sheet is None:
+                return Response(status=404)
+            self._page_layout(page)
+            style_sheet = page.style_sheet
+        if request.if_none_match.contains(style_sheet.etag):
+            return Response(status=304)
+        response = Response(style_sheet.css, mimetype='text/css')
+        response.set_etag(style_sheet.etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    def serve_metrics(self):
+        """Serve the measures of the callbacks in the Prometheus text format."""
+        return Response(self.callback_metrics.to_prometheus(), mimetype='text/plain; version=0.0.4')
+
+    @staticmethod
+    def _record_callback_payload(response: Response) -> Response:
+        if 'traced_callback' in g:
+            CallbackMetrics.record_payload(request.content_length or 0, response.calculate_content_length() or 0)
+        return response
+
+
+class ProfileRecord(NamedTuple):
+    """Measure of a phase of a component."""
+
+    component_class: str
+    """Name of the class of the component"""
+    component_id: Any
+    """Id of the component"""
+    phase: str
+    """One of `__init__`, `register_callbacks` and `layout`"""
+    duration: float
+    """Duration in seconds, including the nested phases"""
+    nodes: int
+    """Number of Dash components returned by `layout`, 0 for the other phases"""
+    stack: Tuple[str, ...]
+    """Phases in progress when the phase was measured, the phase itself last"""
+
+
+# Profiler of the components, while a StartupProfiler is used as a context manager
+_active_profiler: Optional['StartupProfiler'] = None
+
+
+def _count_nodes(layout) -> int:
+    """Count the Dash components of a layout, without resolving its LayoutComponent."""
+    nodes, stack = 0, [layout]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, (list, tuple)):
+            stack.extend(item)
+        elif isinstance(item, Component):
+            nodes += 1
+            children = getattr(item, 'children', None)
+            if children is not None:
+                stack.append(children)
+    return nodes
+
+
+class StartupProfiler:
+    """Records the time spent by each component in `__init__`, `register_callbacks` and `layout`.
+
+    Phases are nested as they are called, e.g. the components created by the __init__ of a page are measured within
+    it. Layouts are resolved one after the other, hence they are not nested.
+
+    Example :
+    with StartupProfiler() as profiler:
+        app = DashApp(__name__)
+        app.layout = MainPage(app)
+    print(profiler.table())
+    profiler.write_folded('startup.folded')  # flamegraph.pl startup.folded > startup.svg
+    """
+
+    def __init__(self):
+        self.records: List[ProfileRecord] = []
+        self._stack: List[str] = []
+        self._previous: Optional[StartupProfiler] = None
+
+    def __enter__(self) -> 'StartupProfiler':
+        global _active_profiler
+        self._previous, _active_profiler = _active_profiler, self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        global _active_profiler
+        _active_profiler = self._previous
+
+    @contextmanager
+    def measure(self, component_class: type, phase: str) -> Iterator[Dict[str, Any]]:
+        """Measure a phase of a component. The caller fills the `component_id` and `nodes` of the yielded dict."""
+        self._stack.append(f'{component_class.__name__}.{phase}')
+        stack = tuple(self._stack)
+        info = {'component_id': None, 'nodes': 0}
+        start = perf_counter()
+        try:
+            yield info
+        finally:
+            duration = perf_counter() - start
+            self._stack.pop()
+            self.records.append(ProfileRecord(component_class.__name__, info['component_id'], phase, duration,
+                                              info['nodes'], stack))
+
+    def table(self, per_instance: bool = False) -> str:
+        """Returns the total time of each phase of each component class, or instance, the slowest first."""
+        totals = defaultdict(lambda: [0, 0.0, 0])
+        for record in self.records:
+            name = f'{record.component_class}({record.component_id})' if per_instance else record.component_class
+            total = totals[name, record.phase]
+            total[0] += 1
+            total[1] += record.duration
+            total[2] += record.nodes
+
+        lines = [f"{'component':<48}{'phase':<20}{'count':>8}{'total (ms)':>12}{'mean (ms)':>12}{'nodes':>8}"]
+        for (name, phase), (count, duration, nodes) in sorted(totals.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{name:<48}{phase:<20}{count:>8}{duration * 1e3:>12.2f}{duration / count * 1e3:>12.2f}"
+                         f"{nodes:>8}")
+        return '\n'.join(lines)
+
+    def folded(self) -> str:
+        """Returns the stacks in the folded format of flamegraph.pl and speedscope, valued by their self time in
+        microseconds."""
+        self_times = defaultdict(float)
+        for record in self.records:
+            self_times[record.stack] += record.duration
+            if len(record.stack) > 1:
+                self_times[record.stack[:-1]] -= record.duration
+        return '\n'.join(f"{';'.join(stack)} {max(round(duration * 1e6), 0)}" for stack, duration in self_times.items())
+
+    def write_folded(self, path: str) -> None:
+        """Write the folded stacks to a file, see `folded`."""
+        with open(path, 'w') as file:
+            file.write(self.folded())
+
+
+class MetaLayoutComponent(type):
+    """Metaclass for the LayoutComponent. It keeps track of the components under construction, so that the ids
+    generated during their __init__ are scoped by their own id."""
 
-class MetaBaseComponent(type):
+    def __call__(cls, *args, **kwargs):
+        stack = _construction_stack()
+        depth = len(stack)
+        try:
+            profiler = _active_profiler
+            if profiler is None:
+                return super().__call__(*args, **kwargs)
+            with profiler.measure(cls, '__init__') as info:
+                instance = super().__call__(*args, **kwargs)
+                info['component_id'] = instance.component_id
+            return instance
+        finally:
+            # LayoutComponent.__init__ pushed the id of the instance
+            del stack[depth:]
+
+
+class MetaBaseComponent(MetaLayoutComponent):
     """Metaclass for the BaseComponent. It defines the instance and call register callbacks after the __init__."""
 
     def __call__(cls, *args, **kwargs):
         instance = super().__call__(*args, **kwargs)
-        instance.register_callbacks()
+        profiler = _active_profiler
+        if profiler is None:
+            cls._register_callbacks(instance)
+        else:
+            with profiler.measure(cls, 'register_callbacks') as info:
+                info['component_id'] = instance.component_id
+                cls._register_callbacks(instance)
         return instance
 
+    def _register_callbacks(cls, instance):
+        if cls.batch_callbacks:
+            instance.app.callback_batcher.register(instance)
+        else:
+            instance.register_callbacks()
+
 
-class LayoutComponent:
+class LayoutComponent(metaclass=MetaLayoutComponent):
     """Base component to use when one want to apply oriented-object framework to Dash. It must implement the layout
     method. This method is called when parsing the global layout of the application."""
 
     def __init__(self, component_id: Optional[str] = None):
         self.component_id = component_id or generate_uuid()
+        _construction_stack().append(str(self.component_id))
 
     def layout(self):
         raise NotImplementedError
@@ -54,12 +493,22 @@ class LayoutComponent:
 
 class BaseComponent(LayoutComponent, metaclass=MetaBaseComponent):
     """Base component to use when one want to apply oriented-object framework to Dash. It must implement the layout
-    method and register_callbacks method."""
+    method and register_callbacks method.
+
+    Set `batch_callbacks` on classes instantiated many times: the ids generated by `generate_id` are then
+    pattern-matching ids, and the callbacks of all the instances are registered once, see CallbackBatcher."""
+
+    batch_callbacks: bool = False
 
     def __init__(self, app: DashApp, component_id: Optional[str] = None):
         super().__init__(component_id=component_id)
         self.app = app
 
+    def generate_id(self, name: str):
+        if not self.batch_callbacks:
+            return super().generate_id(name)
+        return {'type': f'{type(self).__name__}_{name}', 'index': str(self.component_id)}
+
     def register_callbacks(self):
         """Callbacks are registered here using the Dash instance stored in self.app.
 
@@ -74,51 +523,248 @@ class BaseComponent(LayoutComponent, metaclass=MetaBaseComponent):
         raise NotImplementedError
 
 
-def _walk_component(layout):
-    children = getattr(layout, 'children', None)
-    if children and (isinstance(children, (list, tuple))):
-        layout.children = [_walk_layout(child) for child in children]
+class WalkStats(NamedTuple):
+    """Statistics of a layout walk."""
 
-    elif children:
-        layout.children = _walk_layout(children)
+    nodes: int
+    """Number of components and lists of children visited"""
+    layout_calls: int
+    """Number of LayoutComponent.layout calls"""
+    memoized: int
+    """Number of LayoutComponent whose subtree was reused from a previous walk"""
+    skipped: int
+    """Number of Dash components whose subtree was not walked again, as it was already resolved by a previous walk"""
+    duration: float
+    """Duration of the walk in seconds"""
 
-    return layout
 
+class LayoutWalker:
+    """Resolve the LayoutComponent of a layout into Dash components.
 
-def _walk_custom_component(item: LayoutComponent):
-    return _walk_layout(item.layout())
+    The layout is walked with an explicit stack, so that deep layouts don't hit the recursion limit. The subtree of
+    each LayoutComponent is memoized by identity: assigning a layout again only calls the layout method of the new
+    components. The children of a component are only rebuilt when one of them is replaced.
 
+    The Dash components of a walked layout only contain Dash components, hence they are recorded by identity and
+    their subtree is not walked again. A walked component whose subtree is modified afterwards, e.g. by adding a
+    LayoutComponent to its children, must be walked again after `clear`.
 
-def _walk_iterable_layout(layout: Iterable):
-    return [_walk_layout(child) for child in layout]
+    Example :
+    walker = LayoutWalker()
+    layout = walker.walk(html.Div([SomeLayoutComponent(), html.P('text')]))
+    walker.last_stats
+    """
 
+    def __init__(self):
+        self._resolved: MutableMapping[LayoutComponent, Any] = WeakKeyDictionary()
+        # Dash components whose subtree was resolved
+        self._clean: MutableSet[Component] = WeakSet()
+        self.last_stats: Optional[WalkStats] = None
 
-def _walk_layout(layout):
-    func = _walk_component
-    if isinstance(layout, LayoutComponent):
-        func = _walk_custom_component
+    def clear(self) -> None:
+        """Forget the memoized subtrees, so that the layout method of every LayoutComponent is called again, and every
+        Dash component walked again."""
+        self._resolved.clear()
+        self._clean.clear()
 
-    elif isinstance(layout, (list, tuple)):
-        func = _walk_iterable_layout
+    def walk(self, layout):
+        """Returns the layout with the LayoutComponent replaced by their own layout, recursively.
 
-    return func(layout)
+        Dash components are modified in place, lists and tuples of children are replaced by lists.
+        """
+        start = perf_counter()
+        counts = Counter()
+        walked: List[Component] = []
+        root, walk = self._resolve(layout, counts)
+        stack = [root] if walk else []
+        while stack:
+            node = stack.pop()
+            counts['nodes'] += 1
+            if isinstance(node, list):
+                # lists are copied by _resolve, they can be modified in place
+                for index, child in enumerate(node):
+                    node[index], walk = self._resolve(child, counts)
+                    if walk:
+                        stack.append(node[index])
+                continue
+
+            walked.append(node)
+            # not a truth test, the length of a component is computed over its whole subtree
+            children = getattr(node, 'children', None)
+            if children is None:
+                continue
+            if isinstance(children, (list, tuple)):
+                resolved = [self._resolve(child, counts) for child in children]
+                if isinstance(children, tuple) or any(new is not old for (new, _), old in zip(resolved, children)):
+                    node.children = [new for new, _ in resolved]
+                stack.extend(new for new, walk in resolved if walk)
+            else:
+                new, walk = self._resolve(children, counts)
+                if new is not children:
+                    node.children = new
+                if walk:
+                    stack.append(new)
+
+        # recorded once the whole layout is resolved, an interrupted walk leaves them to be walked again
+        self._clean.update(walked)
+        self.last_stats = WalkStats(counts['nodes'], counts['layout_calls'], counts['memoized'], counts['skipped'],
+                                    perf_counter() - start)
+        logger.debug('Layout walked', **self.last_stats._asdict())
+        return root
+
+    def _resolve(self, item, counts: Counter) -> Tuple[Any, bool]:
+        """Returns the replacement of an item of the layout, and whether its children must be walked."""
+        chain = []
+        while isinstance(item, LayoutComponent):
+            if item in self._resolved:
+                counts['memoized'] += 1
+                resolved, walk = self._resolved[item], False
+                break
+            counts['layout_calls'] += 1
+            chain.append(item)
+            profiler = _active_profiler
+            if profiler is None:
+                item = item.layout()
+            else:
+                with profiler.measure(type(item), 'layout') as info:
+                    info['component_id'] = item.component_id
+                    item = item.layout()
+                    info['nodes'] = _count_nodes(item)
+        else:
+            if isinstance(item, (list, tuple)):
+                resolved, walk = list(item), True
+            elif not isinstance(item, Component):
+                resolved, walk = item, False
+            elif item in self._clean:
+                counts['skipped'] += 1
+                resolved, walk = item, False
+            else:
+                resolved, walk = item, True
+
+        for component in chain:
+            self._resolved[component] = resolved
+        return resolved, walk
+
+
+class LazyPage:
+    """Page of a DashApp, whose component is walked on its first visit.
+
+    The component is instantiated on registration, so that its callbacks are known to every worker, hence its costly
+    part, e.g. reading a file, should be done by a `load` method of the component, called before its first walk. With
+    compiled styles, `style_sheet` holds the styles of the page only.
+    """
+
+    def __init__(self, component_class: Type[LayoutComponent], **kwargs):
+        self.component_class = component_class
+        self.kwargs = kwargs
+        self.component: Optional[LayoutComponent] = None
+        self.style_sheet: Optional[StyleSheet] = None
+        self._layout = None
+        self._lock = Lock()
+
+    def instantiate(self) -> LayoutComponent:
+        """Returns the component of the page, instantiating it if needed."""
+        if self.component is None:
+            with self._lock:
+                if self.component is None:
+                    self.component = self.component_class(**self.kwargs)
+        return self.component
+
+    def layout(self, walk: Callable[[LayoutComponent], Any]):
+        """Returns the layout of the page, resolving the component with `walk` on the first call."""
+        if self._layout is None:
+            component = self.instantiate()
+            with self._lock:
+                if self._layout is None:
+                    load = getattr(component, 'load', None)
+                    if load is not None:
+                        load()
+                    self._layout = walk(component)
+        return self._layout
+
+
+def _check_property(component: Component, key: str, value) -> None:
+    """Validate a property of a cloned component, as Component.__init__ does."""
+    wildcards = component._valid_wildcard_attributes
+    if key not in component._prop_names and not any(key.startswith(wildcard) for wildcard in wildcards):
+        raise TypeError(f"The `{component._type}` component received an unexpected keyword argument: `{key}`")
+    if key not in component._base_nodes and isinstance(value, Component):
+        raise TypeError(f"The `{component._type}` component detected a Component for a prop other than `children`, "
+                        f"got {value!r} for `{key}`")
+    if key == 'id' and not isinstance(value, (str, dict)):
+        raise TypeError(f"`id` prop must be a string or dict, not {value!r}")
 
 
 class ComponentFactory:
     """Utility class that wraps an existing Component and apply default keywords.
 
+    Keywords given when calling the factory override the default ones, except `className` which is appended to the
+    default class name, and `style` which is merged into the default style.
+
+    With `fast=True`, the component is constructed once with the default keywords, and each call clones it before
+    setting the keywords of the call, which are only checked to be properties of the component. Mutable defaults
+    (dictionaries and lists other than FrozenStyle) are copied, so that clones can be modified independently.
+
     Examples :
     ButtonWithMargin = ComponentFactory(html.Button, style={'margin': '1rem'})
 
     from dash_components import Style
 
     CenteredButton = ComponentFactory(html.Button, style=Style().center()).
-    button = CenteredButton(id=...)"""
+    button = CenteredButton(id=...)
+
+    Button = ComponentFactory(dbc.Button, fast=True, className=ClassName().margin(Spacing.extra_small))
+    button = Button('Add', id=..., className='w-100')  # className='m-1 w-100'"""
 
-    def __init__(self, base_class, **base_class_kwwargs):
+    def __init__(self, base_class, fast: bool = False, **base_class_kwwargs):
         self.base_class = base_class
         self.keywords = base_class_kwwargs
         update_wrapper(self, base_class)
+        self.fast = fast
+        self._prototype: Optional[Component] = None
+        if fast:
+            self._prototype = base_class(**base_class_kwwargs)
+            self._positional = tuple(signature(base_class).parameters)
+            self._mutable_keys = tuple(key for key, value in base_class_kwwargs.items()
+                                       if isinstance(value, (dict, list)) and not isinstance(value, FrozenStyle))
+
+    def _merge_keyword(self, key: str, value):
+        """Returns the value of a keyword of the call, merged with the default one if needed."""
+        default = self.keywords.get(key)
+        if not default or not value:
+            return value
+        if key == 'className':
+            return ClassName(default).apply(value)
+        if key == 'style':
+            return Style({**default, **value})
+        return value
+
+    def _merge_keywords(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Returns the keywords of the call merged with the default ones."""
+        return {**self.keywords, **{key: self._merge_keyword(key, value) for key, value in kwargs.items()}}
 
     def __call__(self, *args, **kwargs):
-        return self.base_class(*args, **kwargs, **self.keywords)
+        if self._prototype is None:
+            return self.base_class(*args, **self._merge_keywords(kwargs))
+        return self._clone(args, kwargs)
+
+    def _clone(self, args: tuple, kwargs: Dict[str, Any]) -> Component:
+        if args:
+            if len(args) > len(self._positional):
+                raise TypeError(f"{self.base_class.__name__} takes at most {len(self._positional)} positional "
+                                f"arguments, got {len(args)}")
+            for key, value in zip(self._positional, args):
+                if key in kwargs:
+                    raise TypeError(f"{self.base_class.__name__} got multiple values for argument '{key}'")
+                kwargs[key] = value
+
+        prototype = self._prototype
+        component = prototype.__class__.__new__(prototype.__class__)
+        state = component.__dict__
+        state.update(prototype.__dict__)
+        for key in self._mutable_keys:
+            state[key] = copy(state[key])
+        for key, value in kwargs.items():
+            _check_property(component, key, value)
+            state[key] = self._merge_keyword(key, value)
+        return component
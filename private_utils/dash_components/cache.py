@@ -0,0 +1,186 @@
+import json
+from collections import OrderedDict
+from functools import wraps
+from hashlib import blake2b
+from threading import RLock
+from time import monotonic
+from typing import Any, Callable, Hashable, NamedTuple, Optional
+
+__all__ = ['Cache', 'CacheInfo', 'fingerprint']
+
+_MISSING = object()
+
+
+def fingerprint(*values) -> bytes:
+    """Returns a digest of JSON-like values, e.g. the records of a table, to be used as a cache key.
+
+    Dictionaries are compared regardless of the order of their keys, values which are not JSON serializable by their
+    string representation.
+    """
+    try:
+        encoded = json.dumps(values, sort_keys=True, separators=(',', ':'), default=str)
+    except TypeError:
+        # keys of different types can't be sorted
+        encoded = json.dumps(values, separators=(',', ':'), default=str)
+    return blake2b(encoded.encode(), digest_size=16).digest()
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a Cache."""
+
+    hits: int
+    """Number of lookups served from the cache"""
+    misses: int
+    """Number of lookups not found in the cache"""
+    maxsize: Optional[int]
+    """Maximum number of entries, None if unbounded"""
+    currsize: int
+    """Current number of entries"""
+    evictions: int
+    """Number of entries removed to respect maxsize"""
+    expirations: int
+    """Number of entries removed because they outlived the ttl"""
+
+    @property
+    def hit_rate(self) -> float:
+        """Ratio of lookups served from the cache (0-1)."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class Cache:
+    """Thread-safe mapping with LRU and optional TTL eviction, keeping track of its hits and misses.
+
+    It can be used directly through `get`, `set` and `get_or_compute`, or as a decorator of functions with hashable
+    arguments, in which case it behaves like `functools.lru_cache` but can be resized, cleared and observed.
+
+    Examples :
+    cache = Cache(maxsize=1024, ttl=60)
+
+    @cache
+    def expensive(value):
+        ...
+
+    cache.cache_info().hit_rate
+    """
+
+    def __init__(self, maxsize: Optional[int] = 128, ttl: Optional[float] = None,
+                 timer: Callable[[], float] = monotonic):
+        """Instantiates a new cache.
+
+        Parameters
+        ----------
+        maxsize :
+            Maximum number of entries, the least recently used ones being evicted first. None for an unbounded cache.
+        ttl :
+            Time to live of the entries in seconds. None for entries that never expire.
+        timer :
+            Function returning the current time in seconds, used to expire the entries.
+        """
+        if maxsize is not None and maxsize < 0:
+            raise ValueError(f"maxsize should be positive, got {maxsize}.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self._entries: OrderedDict[Hashable, tuple[Optional[float], Any]] = OrderedDict()
+        self._lock = RLock()
+        self._hits = self._misses = self._evictions = self._expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING, count=False) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None, count: bool = True) -> Any:
+        """Returns the value stored for the key, or `default` if it is missing or expired.
+
+        Parameters
+        ----------
+        key :
+            Key to look up.
+        default :
+            Value to return when the key is not in the cache.
+        count :
+            Whether the lookup is accounted for in the hits and misses.
+        """
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at is None or expires_at > self.timer():
+                    self._entries.move_to_end(key)
+                    self._hits += count
+                    return value
+                del self._entries[key]
+                self._expirations += 1
+            self._misses += count
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store the value for the key, evicting the least recently used entries if the cache is full."""
+        if self.maxsize == 0:
+            return
+        expires_at = None if self.ttl is None else self.timer() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def get_or_compute(self, key: Hashable, function: Callable, *args, **kwargs) -> Any:
+        """Returns the value stored for the key, computing it with `function(*args, **kwargs)` on a miss.
+
+        The function is called outside the lock, so concurrent misses on the same key may compute it more than once.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = function(*args, **kwargs)
+            self.set(key, value)
+        return value
+
+    def _evict(self) -> None:
+        if self.maxsize is None:
+            return
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def resize(self, maxsize: Optional[int]) -> None:
+        """Change the maximum number of entries, evicting the least recently used ones if needed."""
+        if maxsize is not None and maxsize < 0:
+            raise ValueError(f"maxsize should be positive, got {maxsize}.")
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self) -> None:
+        """Remove all the entries and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = self._expirations = 0
+
+    def cache_info(self) -> CacheInfo:
+        """Returns the statistics of the cache."""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self.maxsize, len(self._entries),
+                             self._evictions, self._expirations)
+
+    def metrics(self, prefix: str = 'cache') -> dict[str, float]:
+        """Returns the statistics as a flat dictionary of metrics, suitable for export to a monitoring system."""
+        info = self.cache_info()
+        metrics = {f'{prefix}_{name}': value for name, value in info._asdict().items() if value is not None}
+        metrics[f'{prefix}_hit_rate'] = info.hit_rate
+        return metrics
+
+    def __call__(self, function: Callable) -> Callable:
+        """Decorate a function so that its results are stored in the cache, keyed on its arguments."""
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            key = (function.__qualname__, args, tuple(kwargs.items()))
+            return self.get_or_compute(key, function, *args, **kwargs)
+
+        wrapper.cache = self
+        wrapper.cache_info = self.cache_info
+        wrapper.cache_clear = self.clear
+        return wrapper
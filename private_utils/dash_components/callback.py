@@ -1,10 +1,17 @@
-from collections import namedtuple
-from typing import Dict, Iterable, List, Mapping, Union
+import json
+from collections import Counter, defaultdict
+from inspect import isawaitable, iscoroutinefunction
+from typing import (Callable, Dict, Hashable, Iterable, List, Mapping,
+                    NamedTuple, Optional, Set, Tuple, Union)
 
-from dash import Input, Output, State, ctx, no_update
+from dash import MATCH, Input, Output, State, ctx, no_update
+from dash.dependencies import DashDependency
 from dash.exceptions import PreventUpdate
 
-__all__ = ['CallbackDispatcher']
+from .cache import _MISSING, Cache, fingerprint
+from .metrics import _callback_name
+
+__all__ = ['CallbackDispatcher', 'CallbackBatcher', 'PayloadStats']
 
 
 def _generate_id(arg) -> str:
@@ -28,21 +35,97 @@ def _filter(iterable, class_or_tuple):
 
 
 class ProxyCallback:
-    def __init__(self, args, fun):
+    def __init__(self, args, fun, memoize: bool = False, keywords: Optional[dict] = None):
         if not all([isinstance(arg, (Output, Input, State)) for arg in args]):
             raise ValueError(f"Expected one of Output, Input or State, got {args}")
+        if memoize and keywords:
+            raise ValueError("Background callbacks can't be memoized, see the cache_by argument of their manager")
 
+        self.args = args
         self.function = fun
-        self.input_prop_ids = [_generate_id(arg) for arg in args if isinstance(arg, (Input, State))]
-        self.outputs_ids = [_generate_id(arg) for arg in args if isinstance(arg, Output)]
-        self.trigger_ids = {str(arg).split('.')[0] for arg in args if isinstance(arg, Input)}
+        self.memoize = memoize
+        # keywords of a background callback, registered on its own
+        self.keywords = keywords or {}
+        self.prop_ids = [_generate_id(arg) for arg in args]
+        self.input_prop_ids = [prop_id for arg, prop_id in zip(args, self.prop_ids) if isinstance(arg, (Input, State))]
+        self.outputs_ids = [prop_id for arg, prop_id in zip(args, self.prop_ids) if isinstance(arg, Output)]
+        # `id.prop` identifiers, as in ctx.triggered_prop_ids
+        self.trigger_ids = {str(arg) for arg in args if isinstance(arg, Input)}
+        # positions among the arguments and outputs of the merged callback, set by CallbackDispatcher.compile
+        self.input_positions: Tuple[int, ...] = ()
+        self.output_positions: Tuple[int, ...] = ()
+        self._single_output: Optional[int] = None
+
+    def bind(self, input_positions: Iterable[int], output_positions: Iterable[int]) -> None:
+        """Set the positions of the arguments and outputs of the sub-callback in the merged callback."""
+        self.input_positions = tuple(input_positions)
+        self.output_positions = tuple(output_positions)
+        # a single output is not returned as a tuple
+        self._single_output = self.output_positions[0] if len(self.output_positions) == 1 else None
+
+    def fill(self, result: list, outputs) -> None:
+        """Write the outputs returned by the sub-callback in their slots of the merged result."""
+        if self._single_output is not None:
+            result[self._single_output] = outputs
+            return
+        for position, value in zip(self.output_positions, outputs):
+            result[position] = value
+
+
+class PayloadStats(NamedTuple):
+    """Size of the arguments uploaded to the callbacks of a CallbackDispatcher."""
+
+    calls: int
+    """Number of calls of the Dash callbacks"""
+    bytes_sent: int
+    """JSON size of the arguments sent"""
+    bytes_saved: int
+    """Estimated JSON size of the arguments a single merged callback would have sent in addition, from the last
+    known size of each argument"""
 
 
 class CallbackDispatcher:
-    def __init__(self, app):
+    """Merge callbacks sharing outputs into a single Dash callback.
+
+    Sub-callbacks are indexed by their inputs, i.e. component id and property: on a trigger, the sub-callbacks of the
+    triggered properties are looked up and called with their own arguments only. When several properties trigger at
+    once, every matching sub-callback is called, in the order of registration, the last one taking precedence on a
+    shared output.
+
+    A merged callback uploads the inputs and states of all its sub-callbacks on every trigger. With `split=True`, the
+    sub-callbacks are grouped by arguments instead, each group being its own Dash callback, with the outputs shared
+    between groups allowed as duplicates. Hence a trigger only uploads the arguments its sub-callbacks need. With
+    `measure=True`, the size of the uploaded arguments is tracked, see `payload_stats`.
+
+    Sub-callbacks registered with `memoize=True` must be pure functions of their arguments: their outputs are stored
+    in `cache`, keyed on a fingerprint of the arguments, and served again for the same arguments, e.g. on the echo
+    trigger of a table updating its own data.
+
+    Sub-callbacks can be coroutine functions, awaited by a merged callback which is then a coroutine function too,
+    hence the application must be created with `use_async=True`. Sub-callbacks registered with the keywords of a
+    background callback, e.g. `background=True, manager=DiskcacheManager(...), progress=Output(...)`, run in the
+    background callback manager of Dash: they are not merged but registered on their own with these keywords, their
+    outputs shared with the merged callbacks being allowed as duplicates.
+
+    Example :
+    with CallbackDispatcher(app, split=True) as dispatcher:
+        @dispatcher.callback(Output('table', 'data'), Input('button', 'n_clicks'), State('table', 'data'))
+        def add_row(n_clicks, records):
+            ...
+
+        @dispatcher.callback(Output('table', 'data'), Input('refresh', 'n_clicks'), background=True, manager=manager)
+        def reload(n_clicks):
+            ...
+    """
+
+    def __init__(self, app, split: bool = False, measure: bool = False, cache: Optional[Cache] = None):
         self._callbacks: List[ProxyCallback] = []
-        self._prop_ids: Dict[str, Union[Output, Input, State]] = dict()
         self.app = app
+        self.split = split
+        self.measure = measure
+        self.cache = cache if cache is not None else Cache(maxsize=256)
+        self._argument_sizes: Dict[str, int] = {}
+        self._calls = self._bytes_sent = self._bytes_saved = 0
 
     def __enter__(self):
         return self
@@ -51,42 +134,279 @@ class CallbackDispatcher:
         if exc_type is None:
             self.compile(self.app)
 
-    def callback(self, *args):
+    def callback(self, *args, memoize: bool = False, **kwargs):
+        """Register a sub-callback, merged on compile. The keywords, e.g. `background`, `manager` or `progress`, are
+        those of a background Dash callback."""
+
         def wrapper(fun):
-            item = ProxyCallback(args, fun)
+            item = ProxyCallback(args, fun, memoize, kwargs)
             self._callbacks.append(item)
-            for arg in args:
-                self._prop_ids[_generate_id(arg)] = arg
-
             return fun
 
         return wrapper
 
+    def payload_stats(self) -> PayloadStats:
+        """Returns the size of the uploaded arguments, tracked when `measure` is set."""
+        return PayloadStats(self._calls, self._bytes_sent, self._bytes_saved)
+
     def compile(self, app):
         # in the example, all callback targets partially or all the same outputs
         # one big callback
         # it takes every inputs, states as inputs and all outputs
+        merged = [callback for callback in self._callbacks if not callback.keywords]
+        background = [callback for callback in self._callbacks if callback.keywords]
+        if not self.split:
+            groups = [merged] if merged else []
+        else:
+            groups_by_inputs: Dict[frozenset, List[ProxyCallback]] = defaultdict(list)
+            for callback in merged:
+                groups_by_inputs[frozenset(callback.input_prop_ids)].append(callback)
+            groups = list(groups_by_inputs.values())
+
+        outputs_groups = Counter(output_id for callbacks in [*groups, *([callback] for callback in background)]
+                                 for output_id in {output_id for callback in callbacks
+                                                   for output_id in callback.outputs_ids})
+        duplicated = {output_id for output_id, count in outputs_groups.items() if count > 1}
+        for callbacks in groups:
+            self._compile_group(app, callbacks, duplicated)
+        for callback in background:
+            self._register_background(app, callback, duplicated)
+
+    @staticmethod
+    def _register_background(app, callback: ProxyCallback, duplicated: Set[str]):
+        """Register a background sub-callback as its own Dash callback, allowing the duplicated outputs."""
+        args = [Output(arg.component_id, arg.component_property, allow_duplicate=True)
+                if prop_id in duplicated else arg for prop_id, arg in zip(callback.prop_ids, callback.args)]
+        keywords = dict(callback.keywords)
+        if duplicated.intersection(callback.outputs_ids):
+            keywords.setdefault('prevent_initial_call', True)
+        app.callback(*args, **keywords)(callback.function)
 
-        outputs = _filter(self._prop_ids, Output)
-        inputs = _filter(self._prop_ids, (Input, State))
+    def _compile_group(self, app, callbacks: List[ProxyCallback], duplicated: Set[str]):
+        """Register a Dash callback dispatching to the sub-callbacks, allowing the duplicated outputs."""
+        prop_ids: Dict[str, Union[Output, Input, State]] = dict()
+        for callback in callbacks:
+            prop_ids.update(zip(callback.prop_ids, callback.args))
+        outputs = {output_id: Output(output.component_id, output.component_property, allow_duplicate=True)
+                   if output_id in duplicated else output for output_id, output in _filter(prop_ids, Output).items()}
+        inputs = _filter(prop_ids, (Input, State))
+        output_positions = {output_id: position for position, output_id in enumerate(outputs)}
+        input_positions = {input_id: position for position, input_id in enumerate(inputs)}
 
-        Result = namedtuple('result', outputs.keys(), defaults=(no_update,) * len(outputs.keys()))
+        triggers = defaultdict(list)
+        for position, callback in enumerate(callbacks):
+            callback.bind((input_positions[input_id] for input_id in callback.input_prop_ids),
+                          (output_positions[output_id] for output_id in callback.outputs_ids))
+            for trigger_id in callback.trigger_ids:
+                triggers[trigger_id].append(position)
+        triggers = {trigger_id: tuple(positions) for trigger_id, positions in triggers.items()}
+        functions = [self._sub_callback_function(app, callback) for callback in callbacks]
+        input_ids = tuple(inputs)
+        outputs_count = len(outputs)
+        template = [no_update] * outputs_count
+        # duplicated outputs can't be updated by the initial call, which is prevented anyway
+        keywords = {'prevent_initial_call': True} if duplicated.intersection(outputs) else {}
+
+        def triggered(args: tuple) -> List[int]:
+            """Returns the positions of the sub-callbacks of the triggered properties."""
+            # an initial call has no trigger
+            if ctx.triggered_id is None:
+                raise PreventUpdate
+            if self.measure:
+                self._measure(input_ids, args)
+            positions = set()
+            for prop_id in ctx.triggered_prop_ids:
+                positions.update(triggers.get(prop_id, ()))
+            return sorted(positions)
 
-        @app.callback(*outputs.values(), *inputs.values())
         def dispatch(*args):
-            # argument are mapped as dict
-            arg_as_dict = {key: arg for arg, key in zip(args, inputs.keys())}
-            context = ctx.triggered_id
-            if context is not None:
-                for callback in self._callbacks:
-                    # Trigger the callback according to context
-                    if context in callback.trigger_ids:
-                        input_args = [arg_as_dict[input_id] for input_id in callback.input_prop_ids]
-                        outputs_args = callback.function(*input_args)
-                        if len(callback.outputs_ids) == 1:  # output is not a tuple
-                            outputs_args = (outputs_args,)
-                        outputs_args = dict(zip(callback.outputs_ids, outputs_args))
-
-                        result = Result(**outputs_args)
-                        return result
-            raise PreventUpdate
+            result = template.copy()
+            updated = False
+            for callback_position in triggered(args):
+                callback = callbacks[callback_position]
+                callback_args = [args[position] for position in callback.input_positions]
+                try:
+                    outputs_args = functions[callback_position](*callback_args)
+                except PreventUpdate:
+                    continue
+                callback.fill(result, outputs_args)
+                updated = True
+
+            if not updated:
+                raise PreventUpdate
+            return result if outputs_count > 1 else result[0]
+
+        async def dispatch_async(*args):
+            result = template.copy()
+            updated = False
+            for callback_position in triggered(args):
+                callback = callbacks[callback_position]
+                callback_args = [args[position] for position in callback.input_positions]
+                try:
+                    outputs_args = functions[callback_position](*callback_args)
+                    if isawaitable(outputs_args):
+                        outputs_args = await outputs_args
+                except PreventUpdate:
+                    continue
+                callback.fill(result, outputs_args)
+                updated = True
+
+            if not updated:
+                raise PreventUpdate
+            return result if outputs_count > 1 else result[0]
+
+        function = dispatch_async if any(iscoroutinefunction(callback.function) for callback in callbacks) else dispatch
+        # named after its sub-callbacks, for the traces of the application
+        function.__qualname__ = f"dispatch[{'+'.join(callback.function.__name__ for callback in callbacks)}]"
+        app.callback(*outputs.values(), *inputs.values(), **keywords)(function)
+
+    def _sub_callback_function(self, app, callback: ProxyCallback) -> Callable:
+        """Returns the function called by the dispatcher for the sub-callback, memoized and traced if requested."""
+        if callback.memoize and iscoroutinefunction(callback.function):
+            async def function(*args):
+                key = (callback, fingerprint(*args))
+                value = self.cache.get(key, _MISSING)
+                if value is _MISSING:
+                    value = await callback.function(*args)
+                    self.cache.set(key, value)
+                return value
+        elif callback.memoize:
+            def function(*args):
+                return self.cache.get_or_compute((callback, fingerprint(*args)), callback.function, *args)
+        else:
+            function = callback.function
+
+        metrics = getattr(app, 'callback_metrics', None)
+        if metrics is not None:
+            function = metrics.trace(function, _callback_name(callback.function))
+        return function
+
+    def _measure(self, input_ids: Tuple[str, ...], args: tuple) -> None:
+        """Track the size of the arguments sent, and of the other arguments of the dispatcher which were not."""
+        sent = 0
+        for input_id, arg in zip(input_ids, args):
+            self._argument_sizes[input_id] = size = len(json.dumps(arg, separators=(',', ':'), default=str))
+            sent += size
+        saved = sum(size for input_id, size in self._argument_sizes.items() if input_id not in input_ids)
+        self._calls += 1
+        self._bytes_sent += sent
+        self._bytes_saved += saved
+
+
+def _flatten(dependencies) -> Iterable:
+    for dependency in dependencies:
+        if isinstance(dependency, (list, tuple)):
+            yield from _flatten(dependency)
+        else:
+            yield dependency
+
+
+def _replace(dependencies, replacements: Mapping[int, DashDependency]) -> list:
+    """Rebuild the (nested) dependencies, replacing the ones found in replacements by their identity."""
+    return [_replace(dependency, replacements) if isinstance(dependency, (list, tuple))
+            else replacements.get(id(dependency), dependency) for dependency in dependencies]
+
+
+def _match_dependency(dependency: DashDependency, index) -> Optional[DashDependency]:
+    """Returns the dependency with MATCH as the index of its id, or None if its id doesn't have that index."""
+    component_id = dependency.component_id
+    if not isinstance(component_id, dict) or component_id.get('index') != index:
+        return None
+    pattern = type(dependency)({**component_id, 'index': MATCH}, dependency.component_property)
+    if isinstance(dependency, Output):
+        pattern.allow_duplicate = dependency.allow_duplicate
+    return pattern
+
+
+def _batch_pattern(dependencies, index) -> Optional[list]:
+    """Returns the pattern-matching version of the dependencies of a component callback, or None if it can't be
+    batched: all the outputs and at least one input must belong to the component."""
+    flat = list(_flatten(dependencies))
+    if not all(isinstance(dependency, DashDependency) for dependency in flat):
+        return None
+    patterns = {id(dependency): _match_dependency(dependency, index) for dependency in flat}
+    outputs = [patterns[id(dependency)] for dependency in flat if isinstance(dependency, Output)]
+    inputs = [patterns[id(dependency)] for dependency in flat if isinstance(dependency, Input)]
+    if not outputs or None in outputs or all(dependency is None for dependency in inputs):
+        return None
+    return _replace(dependencies, {key: pattern for key, pattern in patterns.items() if pattern is not None})
+
+
+class _CallbackRecorder:
+    """Stand-in for the application while a component registers its callbacks, recording them instead."""
+
+    def __init__(self, app):
+        self._app = app
+        self.callbacks = []
+
+    def callback(self, *args, **kwargs):
+        def wrapper(fun):
+            self.callbacks.append((args, kwargs, fun))
+            return fun
+
+        return wrapper
+
+    def __getattr__(self, name):
+        return getattr(self._app, name)
+
+
+class CallbackBatcher:
+    """Registers the callbacks of the instances of a component class as one pattern-matching callback per class.
+
+    The ids of the components have to be dictionaries indexed by the component_id, as generated by
+    `BaseComponent.generate_id` when `batch_callbacks` is set. Callbacks whose outputs and at least one input belong to
+    the component are registered once with MATCH, and dispatched to the instance owning the triggered outputs. The
+    other callbacks are registered as is.
+
+    Example :
+    class Counter(BaseComponent):
+        batch_callbacks = True
+
+        def register_callbacks(self):
+            @self.app.callback(Output(self.generate_id('text'), 'children'),
+                               Input(self.generate_id('button'), 'n_clicks'))
+            def count(n_clicks):
+                return str(n_clicks)
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._functions: Dict[Hashable, Dict[str, Callable]] = {}
+        self.batched = 0
+        """Number of callbacks merged into an already registered one"""
+
+    def register(self, component) -> None:
+        """Register the callbacks of the component, through its register_callbacks method."""
+        recorder = _CallbackRecorder(self.app)
+        component.app = recorder
+        try:
+            component.register_callbacks()
+        finally:
+            component.app = self.app
+
+        for position, (args, kwargs, function) in enumerate(recorder.callbacks):
+            pattern = _batch_pattern(args, component.component_id)
+            if pattern is None:
+                self.app.callback(*args, **kwargs)(function)
+                continue
+
+            key = (type(component), position, tuple(f'{type(dependency).__name__}:{dependency}'
+                                                    for dependency in _flatten(pattern)), repr(sorted(kwargs.items())))
+            functions = self._functions.get(key)
+            if functions is None:
+                functions = self._functions[key] = {}
+                self.app.callback(*pattern, **kwargs)(self._dispatcher(functions, function))
+            else:
+                self.batched += 1
+            functions[component.component_id] = function
+
+    @staticmethod
+    def _dispatcher(functions: Dict[str, Callable], function: Callable) -> Callable:
+        """Returns the callback dispatching to the functions of the instances, named after the (shared) function."""
+        def dispatch(*args):
+            outputs = ctx.outputs_list
+            output = outputs[0] if isinstance(outputs, list) else outputs
+            return functions[output['id']['index']](*args)
+
+        dispatch.__qualname__ = function.__qualname__
+        return dispatch
@@ -1,11 +1,19 @@
 import re
+from collections import Counter, defaultdict
 from colorsys import hls_to_rgb, rgb_to_hls
-from difflib import get_close_matches
-from functools import lru_cache
+from difflib import SequenceMatcher, get_close_matches
+from enum import Enum
+from functools import wraps
 from operator import itemgetter
-from typing import Callable, NamedTuple, Optional, Sequence, Tuple, Union
+from typing import (Callable, Dict, Iterable, Iterator, List, NamedTuple,
+                    Optional, Sequence, Tuple, Union)
 
-__all__ = ['COLOR_NAME_TO_RGB', 'HSL', 'Color']
+import numpy as np
+
+from .cache import Cache
+
+__all__ = ['COLOR_NAME_TO_RGB', 'HSL', 'Color', 'ColorArray', 'ColorSpace', 'ColorScale', 'ColorParseError',
+           'Palette', 'SuggestionIndex', 'get_color_cache', 'set_color_cache', 'validate_colors']
 
 COLOR_NAME_TO_RGB: dict[str, Union[Tuple[int, int, int], Tuple[int, int, int, float]]] = {
     # Let's start with a specific pseudo-color::
@@ -220,6 +228,38 @@ _split_pairs4: Callable[[str], tuple[str, str, str, str]] = itemgetter(
 )
 
 
+# Cache shared by the Color transformations, see `set_color_cache` to size it or replace it.
+_color_cache = Cache(maxsize=1024 * 4)
+
+
+def get_color_cache() -> Cache:
+    """Returns the cache used by `Color.parse`, `Color.darken` and `Color.get_contrast_text`."""
+    return _color_cache
+
+
+def set_color_cache(cache: Cache) -> None:
+    """Replace the cache used by the Color transformations, e.g. to size it to the palette of the application or to
+    expire its entries.
+
+    Examples :
+    set_color_cache(Cache(maxsize=256, ttl=3600))
+    get_color_cache().cache_info()
+    """
+    global _color_cache
+    _color_cache = cache
+
+
+def _color_cached(function: Callable) -> Callable:
+    """Route the calls of a Color transformation through the current color cache."""
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        key = (function.__qualname__, args, tuple(kwargs.items()))
+        return _color_cache.get_or_compute(key, function, *args, **kwargs)
+
+    return wrapper
+
+
 def get_suggestion(word: str, possible_words: Sequence[str]) -> Optional[str]:
     """
     Returns a close match of `word` amongst `possible_words`.
@@ -235,6 +275,129 @@ def get_suggestion(word: str, possible_words: Sequence[str]) -> Optional[str]:
     return None if not possible_matches else possible_matches[0]
 
 
+def _ngrams(word: str, n: int) -> set[str]:
+    """Returns the n-grams of a word, padded so that its first and last characters make their own n-grams."""
+    padded = f"^{word}$"
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+class SuggestionIndex:
+    """Precomputed n-gram index over a fixed set of words, to find a close match of a word amongst them quickly.
+
+    Only the words with the most n-grams in common with the searched word (relatively to their number of n-grams) are
+    compared with `difflib`, instead of all the possible words as `get_suggestion` does. Suggestions are also cached,
+    as the same typos tend to be repeated.
+    """
+
+    def __init__(self, possible_words: Iterable[str], n: int = 2, candidates: int = 8, cutoff: float = 0.6,
+                 cache_size: Optional[int] = 1024):
+        """Instantiates a new index.
+
+        Parameters
+        ----------
+        possible_words :
+            The words amongst which we want to find close matches.
+        n :
+            Size of the n-grams.
+        candidates :
+            Number of words, with the most n-grams in common with the searched word, that are compared with it.
+        cutoff :
+            Minimum similarity ratio (0-1) of a suggestion, as defined by `difflib.SequenceMatcher`.
+        cache_size :
+            Number of suggestions kept in cache.
+        """
+        self.possible_words = tuple(possible_words)
+        self.n = n
+        self.candidates = candidates
+        self.cutoff = cutoff
+        self._index: Dict[str, List[int]] = defaultdict(list)
+        self._ngrams_count: List[int] = []
+        for position, possible_word in enumerate(self.possible_words):
+            ngrams = _ngrams(possible_word, n)
+            self._ngrams_count.append(len(ngrams))
+            for ngram in ngrams:
+                self._index[ngram].append(position)
+        self._cache = Cache(maxsize=cache_size)
+
+    def suggest(self, word: str) -> Optional[str]:
+        """Returns a close match of `word`, or `None` if no close matches could be found."""
+        return self._cache.get_or_compute(word, self._suggest, word)
+
+    def _suggest(self, word: str) -> Optional[str]:
+        ngrams = _ngrams(word, self.n)
+        shared_ngrams = Counter(position for ngram in ngrams for position in self._index.get(ngram, ()))
+        # Rank the words by Dice coefficient, so that short words are not penalized
+        ranked = sorted(shared_ngrams,
+                        key=lambda position: shared_ngrams[position] / (len(ngrams) + self._ngrams_count[position]),
+                        reverse=True)
+
+        matcher = SequenceMatcher()
+        matcher.set_seq2(word)
+        best_score, best_match = self.cutoff, None
+        for position in ranked[:self.candidates]:
+            candidate = self.possible_words[position]
+            matcher.set_seq1(candidate)
+            if matcher.real_quick_ratio() >= best_score and matcher.quick_ratio() >= best_score:
+                # Ties are resolved as difflib does, in favor of the greatest word.
+                score = matcher.ratio()
+                if (score, candidate) > (best_score, best_match or ''):
+                    best_score, best_match = score, candidate
+        return best_match
+
+
+def _parse_hex_or_rgb(color_text: str) -> Optional[tuple]:
+    """Fast path of `Color.parse` for the hex, rgb and rgba formats, dispatching on the prefix of the text instead of
+    matching `RE_COLOR`.
+
+    Returns the components of the color, or `None` if the text is not in one of these formats, in which case it should
+    be parsed with the regular expression.
+    """
+    if color_text.startswith('#'):
+        digits = color_text[1:]
+        # Prevents int from accepting signs, spaces, underscores or a 0x prefix
+        if not (digits.isascii() and digits.isalnum()) or digits.startswith(('0x', '0X')):
+            return None
+        try:
+            value = int(digits, 16)
+        except ValueError:
+            return None
+        size = len(digits)
+        if size == 6:
+            return value >> 16, (value >> 8) & 0xFF, value & 0xFF, 1.0
+        elif size == 8:
+            return value >> 24, (value >> 16) & 0xFF, (value >> 8) & 0xFF, (value & 0xFF) / 255.0
+        elif size == 3:
+            return (value >> 8) * 0x11, ((value >> 4) & 0xF) * 0x11, (value & 0xF) * 0x11, 1.0
+        elif size == 4:
+            return ((value >> 12) * 0x11, ((value >> 8) & 0xF) * 0x11, ((value >> 4) & 0xF) * 0x11,
+                    (value & 0xF) * 0x11 / 255.0)
+        return None
+
+    # Only integer components without spaces are handled, other decimals are left to the regular expression.
+    if color_text[:4] == 'rgb(' and color_text[-1:] == ')':
+        values = color_text[4:-1].split(',')
+        if len(values) == 3:
+            red, green, blue = values
+            if red.isdecimal() and green.isdecimal() and blue.isdecimal():
+                red, green, blue = int(red), int(green), int(blue)
+                return red if red < 255 else 255, green if green < 255 else 255, blue if blue < 255 else 255, 1.0
+    elif color_text[:5] == 'rgba(' and color_text[-1:] == ')':
+        values = color_text[5:-1].split(',')
+        if len(values) == 4:
+            red, green, blue, alpha = values
+            if (red.isdecimal() and green.isdecimal() and blue.isdecimal()
+                    and alpha[:1].isdecimal() and alpha.replace('.', '', 1).isdecimal()):
+                red, green, blue, alpha = int(red), int(green), int(blue), float(alpha)
+                return (red if red < 255 else 255, green if green < 255 else 255, blue if blue < 255 else 255,
+                        alpha if alpha < 1.0 else 1.0)
+    return None
+
+
+def _linearize(component: float) -> float:
+    """Convert a normalized sRGB component to linear light, as defined by WCAG 2."""
+    return component / 12.92 if component <= 0.03928 else pow((component + 0.055) / 1.055, 2.4)
+
+
 def rgb_to_lab(rgb: 'Color') -> 'Lab':
     """Convert an RGB color to the CIE-L*ab format.
     Uses the standard RGB color space with a D65/2⁰ standard illuminant.
@@ -460,6 +623,32 @@ class Color(NamedTuple):
         brightness = (299 * red + 587 * green + 114 * blue) / 1000
         return brightness
 
+    @property
+    def luminance(self) -> float:
+        """Get the relative luminance, as defined by WCAG 2.
+
+        Returns:
+            float: Luminance value (0-1).
+        """
+        red, green, blue = [_linearize(component) for component in self.normalized]
+        return 0.2126 * red + 0.7152 * green + 0.0722 * blue
+
+    def contrast_ratio(self, other: 'Color') -> float:
+        """Get the WCAG 2 contrast ratio between this color and another one, from 1 to 21. Alpha is ignored.
+
+        Parameters
+        ----------
+        other : Color
+            Another color, e.g. the color of the text displayed over this one.
+
+        Returns
+        -------
+            float
+            The contrast ratio.
+        """
+        lighter, darker = sorted((self.luminance, other.luminance), reverse=True)
+        return (lighter + 0.05) / (darker + 0.05)
+
     @property
     def hex(self) -> str:
         """The color in CSS hex form, with 6 digits for RGB, and 8 digits for RGBA.
@@ -565,7 +754,7 @@ class Color(NamedTuple):
         return NotImplemented
 
     @classmethod
-    @lru_cache(maxsize=1024 * 4)
+    @_color_cached
     def parse(cls, color_text: Union[str, 'Color']) -> 'Color':
         """Parse a string containing a named color or CSS-style color.
         Colors may be parsed from the following formats:
@@ -596,18 +785,31 @@ class Color(NamedTuple):
         -------
             Color: New color object.
         """
+        return cls._parse(color_text)
+
+    @classmethod
+    def _parse(cls, color_text: Union[str, 'Color']) -> 'Color':
+        """Uncached `parse`, e.g. for bulk input which would evict the palette of the application from the cache."""
         if isinstance(color_text, Color):
             return color_text
         color_from_name = COLOR_NAME_TO_RGB.get(color_text)
         if color_from_name is not None:
             return cls(*color_from_name)
+        components = _parse_hex_or_rgb(color_text)
+        if components is not None:
+            return cls(*components)
+        return cls._parse_with_regex(color_text)
+
+    @classmethod
+    def _parse_with_regex(cls, color_text: str) -> 'Color':
+        """Parse a CSS-style color with `RE_COLOR`, as a fallback of the fast path for hex and rgb colors."""
         color_match = RE_COLOR.match(color_text)
         if color_match is None:
             error_message = f"failed to parse {color_text!r} as a color"
             suggested_color = None
             if not color_text.startswith(("#", "rgb", "hsl")):
                 # Seems like we tried to use a color name: let's try to find one that is close enough:
-                suggested_color = get_suggestion(color_text, COLOR_NAME_TO_RGB.keys())
+                suggested_color = _COLOR_NAME_INDEX.suggest(color_text)
                 if suggested_color:
                     error_message += f"; did you mean '{suggested_color}'?"
             raise ColorParseError(error_message, suggested_color)
@@ -669,7 +871,7 @@ class Color(NamedTuple):
             raise AssertionError("Can't get here if RE_COLOR matches")
         return color
 
-    @lru_cache(maxsize=1024)
+    @_color_cached
     def darken(self, amount: float, alpha: Optional[float] = None) -> 'Color':
         """Darken the color by a given amount.
 
@@ -700,7 +902,7 @@ class Color(NamedTuple):
         """
         return self.darken(-amount, alpha)
 
-    @lru_cache(maxsize=1024)
+    @_color_cached
     def get_contrast_text(self, alpha=0.95) -> 'Color':
         """Get a light or dark color that best contrasts this color, for use with text.
         Args:
@@ -718,3 +920,735 @@ class Color(NamedTuple):
 # Color constants
 WHITE = Color(255, 255, 255)
 BLACK = Color(0, 0, 0)
+
+_COLOR_NAME_INDEX = SuggestionIndex(COLOR_NAME_TO_RGB.keys())
+
+
+def validate_colors(colors: Iterable[Union[str, Color]]) -> Dict[str, ColorParseError]:
+    """Validate a collection of colors in one pass, e.g. all the colors of a style configuration.
+
+    Parameters
+    ----------
+    colors : Iterable[Union[str, Color]]
+        Colors in any of the formats accepted by `Color.parse`.
+
+    Returns
+    -------
+        Dict[str, ColorParseError]
+        The colors that failed to parse, mapped to their error. The error holds the suggested color, if any.
+    """
+    failures = {}
+    for color in colors:
+        if color in failures:
+            continue
+        try:
+            Color.parse(color)
+        except ColorParseError as error:
+            failures[color] = error
+    return failures
+
+
+def _rgb_to_lab_array(rgb: np.ndarray) -> np.ndarray:
+    """Vectorized counterpart of `rgb_to_lab`, operating on an (n, 3) array of RGB components."""
+    rgb = rgb / 255
+    with np.errstate(invalid='ignore'):
+        linear = np.where(rgb > 0.04045, np.power((rgb + 0.055) / 1.055, 2.4), rgb / 12.92)
+    r, g, b = linear[:, 0], linear[:, 1], linear[:, 2]
+
+    xyz = np.empty_like(linear)
+    xyz[:, 0] = (r * 41.24 + g * 35.76 + b * 18.05) / 95.047
+    xyz[:, 1] = (r * 21.26 + g * 71.52 + b * 7.22) / 100
+    xyz[:, 2] = (r * 1.93 + g * 11.92 + b * 95.05) / 108.883
+
+    off = 16 / 116
+    with np.errstate(invalid='ignore'):
+        xyz = np.where(xyz > 0.008856, np.power(xyz, 1 / 3), 7.787 * xyz + off)
+    x, y, z = xyz[:, 0], xyz[:, 1], xyz[:, 2]
+
+    return np.column_stack((116 * y - 16, 500 * (x - y), 200 * (y - z)))
+
+
+def _lab_to_rgb_array(lab: np.ndarray) -> np.ndarray:
+    """Vectorized counterpart of `lab_to_rgb`, operating on an (n, 3) array of CIE-L*ab components.
+    Returns the (unclamped) integer RGB components."""
+    y = (lab[:, 0] + 16) / 116
+    x = lab[:, 1] / 500 + y
+    z = y - lab[:, 2] / 200
+
+    off = 16 / 116
+    y = np.where(y > 0.2068930344, np.power(y, 3), (y - off) / 7.787)
+    x = np.where(x > 0.2068930344, 0.95047 * np.power(x, 3), 0.122059 * (x - off))
+    z = np.where(z > 0.2068930344, 1.08883 * np.power(z, 3), 0.139827 * (z - off))
+
+    linear = np.empty_like(lab)
+    linear[:, 0] = x * 3.2406 + y * -1.5372 + z * -0.4986
+    linear[:, 1] = x * -0.9689 + y * 1.8758 + z * 0.0415
+    linear[:, 2] = x * 0.0557 + y * -0.2040 + z * 1.0570
+
+    with np.errstate(invalid='ignore'):
+        rgb = np.where(linear > 0.0031308, 1.055 * np.power(linear, 1 / 2.4) - 0.055, 12.92 * linear)
+    return (rgb * 255).astype(np.int64)
+
+
+def _hue_to_rgb_array(m1: np.ndarray, m2: np.ndarray, hue: np.ndarray) -> np.ndarray:
+    """Vectorized counterpart of `colorsys._v`."""
+    hue = hue % 1.0
+    return np.select(
+        [hue < 1 / 6, hue < 0.5, hue < 2 / 3],
+        [m1 + (m2 - m1) * hue * 6.0, m2, m1 + (m2 - m1) * (2 / 3 - hue) * 6.0],
+        default=m1,
+    )
+
+
+def _ascii_table(strings: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Encode ASCII strings as a zero-padded (n, width) array of character codes, along with their lengths."""
+    lengths = np.array([len(string) for string in strings], dtype=np.intp)
+    width = int(lengths.max(initial=0))
+    encoded = b''.join(string.encode('ascii').ljust(width, b'\0') for string in strings)
+    return np.frombuffer(encoded, dtype=np.uint8).reshape(len(strings), width), lengths
+
+
+# Character codes of the decimal and hexadecimal representations of every color component (0-255)
+_DECIMAL_TABLE = _ascii_table([str(value) for value in range(256)])
+_HEX_TABLE = _ascii_table([f"{value:02X}" for value in range(256)])
+
+
+# Value of the hexadecimal digits by character code, -1 for the other characters
+_HEX_DIGITS = np.full(256, -1, dtype=np.int64)
+_HEX_DIGITS[np.frombuffer(b'0123456789abcdefABCDEF', dtype=np.uint8)] = [*range(16), *range(10, 16)]
+
+
+def _parse_hex_or_rgb_array(strings: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized `_parse_hex_or_rgb` of ASCII strings.
+
+    Returns the (n, 4) components of the colors, and whether each string was in one of the formats of the fast path.
+    The other strings must be parsed with `Color.parse`.
+    """
+    chars, lengths = _ascii_table(strings)
+    size, width = chars.shape
+    components = np.zeros((size, 4))
+    components[:, 3] = 1.0
+    parsed = np.zeros(size, dtype=bool)
+    if not width:
+        return components, parsed
+    rows = np.arange(size)
+
+    is_hex = chars[:, 0] == ord('#')
+    for digits_count in (3, 4, 6, 8):
+        hex_rows = np.flatnonzero(is_hex & (lengths == digits_count + 1))
+        if not len(hex_rows):
+            continue
+        digits = _HEX_DIGITS[chars[hex_rows, 1:digits_count + 1]]
+        hex_rows, digits = hex_rows[(digits >= 0).all(axis=1)], digits[(digits >= 0).all(axis=1)]
+        values = digits * 0x11 if digits_count < 6 else digits[:, 0::2] * 16 + digits[:, 1::2]
+        components[hex_rows, :3] = values[:, :3]
+        if values.shape[1] == 4:
+            components[hex_rows, 3] = values[:, 3] / 255.0
+        parsed[hex_rows] = True
+
+    # rgb(RED,GREEN,BLUE) with integer components, read one character position at a time over all the rows
+    is_rgb = ((lengths >= 10) & (chars[:, :4] == np.frombuffer(b'rgb(', dtype=np.uint8)).all(axis=1)
+              & (chars[rows, lengths - 1] == ord(')'))) if width >= 4 else np.zeros(size, dtype=bool)
+    if is_rgb.any():
+        values = np.zeros((size, 3), dtype=np.int64)
+        accumulator = np.zeros(size, dtype=np.int64)
+        digits_count = np.zeros(size, dtype=np.int64)
+        slot = np.zeros(size, dtype=np.int64)
+        for position in range(4, width):
+            column = chars[:, position].astype(np.int64)
+            inside = position < lengths - 1
+            is_digit = inside & (column >= ord('0')) & (column <= ord('9'))
+            is_comma = inside & (column == ord(','))
+            is_rgb &= ~inside | is_digit | is_comma
+            # components are clamped to 255 anyway, capping them avoids overflows
+            accumulator = np.where(is_digit, np.minimum(accumulator * 10 + column - ord('0'), 256), accumulator)
+            digits_count += is_digit
+            separator = is_comma | (position == lengths - 1)
+            is_rgb &= ~separator | ((digits_count > 0) & (slot < 3))
+            values[rows[separator], np.minimum(slot[separator], 2)] = accumulator[separator]
+            slot += separator
+            accumulator[separator] = 0
+            digits_count[separator] = 0
+        is_rgb &= slot == 3
+        components[is_rgb, :3] = np.minimum(values[is_rgb], 255)
+        parsed |= is_rgb
+    return components, parsed
+
+
+def _constant_piece(string: str, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Repeat a constant string as a piece of `_concat_ascii`, without copying it for each row."""
+    chars, lengths = _ascii_table([string])
+    return np.broadcast_to(chars, (size, chars.shape[1])), np.broadcast_to(lengths, (size,))
+
+
+def _concat_ascii(pieces: Sequence[Union[str, Tuple[np.ndarray, np.ndarray]]], size: int) -> List[str]:
+    """Concatenate row-wise pieces of ASCII text into `size` strings without looping in Python over the rows.
+
+    Each piece is either a constant string, or a tuple of per-row character codes and lengths as returned by
+    `_ascii_table`. Character codes beyond the length of a row must be zeros.
+    """
+    pieces = [_constant_piece(piece, size) if isinstance(piece, str) else piece for piece in pieces]
+    width = sum(chars.shape[1] for chars, _ in pieces) + 1
+    buffer = np.zeros(size * width, dtype=np.uint8)
+    # Flat position in the buffer where the next piece of each row starts
+    cursor = np.arange(0, size * width, width, dtype=np.intp)
+    for chars, lengths in pieces:
+        # Padding characters are overwritten by the next pieces, or left as trailing zeros.
+        for position in range(chars.shape[1]):
+            buffer[cursor + position] = chars[:, position]
+        cursor += lengths
+    buffer[cursor] = ord('\n')
+    text = buffer[buffer != 0].tobytes().decode('ascii')
+    return text.split('\n')[:-1]
+
+
+def _components_table(components: np.ndarray,
+                      table: Tuple[np.ndarray, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Gather the character codes of each component (0-255) from a precomputed table."""
+    chars, lengths = table
+    return chars[components], lengths[components]
+
+
+class ColorArray:
+    """A collection of colors stored as NumPy arrays, exposing the `Color` transformations over the whole
+    collection at once.
+
+    Results are identical to applying the corresponding `Color` method to each element, which makes this class a
+    drop-in replacement when styling large tables, e.g. one color per cell of a heatmap.
+
+    Examples :
+    colors = ColorArray.parse(['red', '#00FF00', 'rgb(0,0,255)'])
+    colors.darken(0.2).css
+    """
+
+    __slots__ = ('rgb', 'alpha')
+
+    def __init__(self, rgb: np.ndarray, alpha: Optional[np.ndarray] = None):
+        """Instantiates a new collection of colors.
+
+        Parameters
+        ----------
+        rgb : np.ndarray
+            Array of shape (n, 3) with the red, green and blue components (0-255).
+        alpha : Optional[np.ndarray]
+            Array of shape (n,) with the alpha components (0-1). Defaults to opaque colors.
+        """
+        self.rgb = np.asarray(rgb, dtype=np.int64).reshape(-1, 3)
+        if alpha is None:
+            alpha = np.ones(len(self.rgb))
+        self.alpha = np.broadcast_to(np.asarray(alpha, dtype=np.float64), (len(self.rgb),))
+
+    @classmethod
+    def from_colors(cls, colors: Iterable[Color]) -> 'ColorArray':
+        """Create a collection from `Color` objects."""
+        components = np.array([tuple(color) for color in colors], dtype=np.float64).reshape(-1, 4)
+        return cls(components[:, :3], components[:, 3])
+
+    @classmethod
+    def parse(cls, colors: Iterable[Union[str, Color]]) -> 'ColorArray':
+        """Parse a collection of colors in any of the formats accepted by `Color.parse`.
+
+        Each distinct value is parsed only once, which makes parsing repetitive data (e.g. categorical columns)
+        essentially a lookup. Hex and integer rgb colors are decoded at once with NumPy, the other formats one by one,
+        bypassing the color cache so that bulk input doesn't evict the palette of the application.
+
+        Parameters
+        ----------
+        colors : Iterable[Union[str, Color]]
+            Collection of named colors, CSS-style colors or `Color` objects.
+
+        Raises
+        ------
+            ColorParseError : If any of the colors is not encoded correctly.
+
+        Returns
+        -------
+            ColorArray
+        """
+        positions = {}
+        codes = np.fromiter((positions.setdefault(color, len(positions)) for color in colors), dtype=np.intp)
+        uniques = list(positions)
+        candidates = np.array([index for index, color in enumerate(uniques)
+                               if isinstance(color, str) and color.isascii()], dtype=np.intp)
+        components, parsed = np.zeros((len(uniques), 4)), np.zeros(len(uniques), dtype=bool)
+        if len(candidates):
+            candidate_components, candidate_parsed = _parse_hex_or_rgb_array([uniques[index] for index in candidates])
+            components[candidates], parsed[candidates] = candidate_components, candidate_parsed
+        for index in np.flatnonzero(~parsed):
+            components[index] = Color._parse(uniques[index])
+        return cls(components[:, :3], components[:, 3])[codes]
+
+    @classmethod
+    def from_lab(cls, lab: np.ndarray, alpha: Optional[np.ndarray] = None) -> 'ColorArray':
+        """Create a collection from an (n, 3) array of CIE-L*ab components, as done by `lab_to_rgb`."""
+        return cls(_lab_to_rgb_array(np.asarray(lab, dtype=np.float64).reshape(-1, 3)), alpha)
+
+    @classmethod
+    def from_hsl(cls, hsl: np.ndarray) -> 'ColorArray':
+        """Create a collection from an (n, 3) array of hue, saturation and lightness, as done by `Color.from_hsl`."""
+        hsl = np.asarray(hsl, dtype=np.float64).reshape(-1, 3)
+        hue, saturation, lightness = hsl[:, 0], hsl[:, 1], hsl[:, 2]
+
+        m2 = np.where(lightness <= 0.5,
+                      lightness * (1.0 + saturation),
+                      lightness + saturation - (lightness * saturation))
+        m1 = 2.0 * lightness - m2
+        rgb = np.column_stack((_hue_to_rgb_array(m1, m2, hue + 1 / 3),
+                               _hue_to_rgb_array(m1, m2, hue),
+                               _hue_to_rgb_array(m1, m2, hue - 1 / 3)))
+        rgb[saturation == 0.0] = lightness[saturation == 0.0, np.newaxis]
+        return cls((rgb * 255 + 0.5).astype(np.int64))
+
+    def __len__(self) -> int:
+        return len(self.rgb)
+
+    def __iter__(self) -> Iterator[Color]:
+        for (red, green, blue), alpha in zip(self.rgb.tolist(), self.alpha.tolist()):
+            yield Color(red, green, blue, alpha)
+
+    def __getitem__(self, item) -> Union[Color, 'ColorArray']:
+        if isinstance(item, (int, np.integer)):
+            red, green, blue = self.rgb[item].tolist()
+            return Color(red, green, blue, float(self.alpha[item]))
+        return ColorArray(self.rgb[item], self.alpha[item])
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.hex!r})"
+
+    def to_colors(self) -> List[Color]:
+        """Returns the collection as a list of `Color` objects."""
+        return list(self)
+
+    def _format(self, formatter: Callable[[Color], str]) -> List[str]:
+        """Apply a scalar `Color` formatter once per distinct color and broadcast the results."""
+        if not len(self):
+            return []
+        components = np.column_stack((self.rgb, self.alpha))
+        uniques, inverse = np.unique(components, axis=0, return_inverse=True)
+        formatted = np.array([formatter(Color(int(red), int(green), int(blue), float(alpha)))
+                              for red, green, blue, alpha in uniques.tolist()], dtype=object)
+        return formatted[inverse.ravel()].tolist()
+
+    def _hex(self, include_alpha: bool) -> List[str]:
+        """Vectorized implementation of `Color.hex` and `Color.hex6`."""
+        clamped = self.clamped
+        rgb = clamped.rgb
+        pieces = ['#', *(_components_table(rgb[:, channel], _HEX_TABLE) for channel in range(3))]
+        if include_alpha:
+            opaque = clamped.alpha == 1
+            chars, lengths = _components_table((clamped.alpha * 255).astype(np.intp), _HEX_TABLE)
+            pieces.append((np.where(opaque[:, np.newaxis], 0, chars), np.where(opaque, 0, lengths)))
+        return _concat_ascii(pieces, len(self))
+
+    @property
+    def inverse(self) -> 'ColorArray':
+        """The inverse of these colors."""
+        return ColorArray(255 - self.rgb, self.alpha)
+
+    @property
+    def is_transparent(self) -> np.ndarray:
+        """Boolean mask of the transparent colors, i.e. with 0 alpha."""
+        return self.alpha == 0
+
+    @property
+    def clamped(self) -> 'ColorArray':
+        """Get the colors with all components saturated to maximum and minimum values."""
+        return ColorArray(np.clip(self.rgb, 0, 255), np.clip(self.alpha, 0.0, 1.0))
+
+    @property
+    def normalized(self) -> np.ndarray:
+        """An (n, 3) array of the color components normalized to between 0 and 1."""
+        return self.rgb / 255
+
+    @property
+    def hsl(self) -> np.ndarray:
+        """Get the colors as an (n, 3) array of hue, saturation and lightness."""
+        normalized = self.normalized
+        red, green, blue = normalized[:, 0], normalized[:, 1], normalized[:, 2]
+        maxc, minc = normalized.max(axis=1), normalized.min(axis=1)
+        sumc, rangec = maxc + minc, maxc - minc
+        lightness = sumc / 2.0
+        grey = minc == maxc
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            saturation = np.where(lightness <= 0.5, rangec / sumc, rangec / (2.0 - maxc - minc))
+            rc, gc, bc = (maxc - red) / rangec, (maxc - green) / rangec, (maxc - blue) / rangec
+        hue = np.select([red == maxc, green == maxc], [bc - gc, 2.0 + rc - bc], default=4.0 + gc - rc)
+        hue = (hue / 6.0) % 1.0
+
+        hue[grey], saturation[grey] = 0.0, 0.0
+        return np.column_stack((hue, saturation, lightness))
+
+    @property
+    def lab(self) -> np.ndarray:
+        """Get the colors as an (n, 3) array of CIE-L*ab components."""
+        return _rgb_to_lab_array(self.rgb)
+
+    @property
+    def brightness(self) -> np.ndarray:
+        """Get the human perceptual brightness (0-1) of each color."""
+        normalized = self.normalized
+        return (299 * normalized[:, 0] + 587 * normalized[:, 1] + 114 * normalized[:, 2]) / 1000
+
+    @property
+    def luminance(self) -> np.ndarray:
+        """Get the relative luminance (0-1) of each color, as defined by WCAG 2."""
+        normalized = self.normalized
+        with np.errstate(invalid='ignore'):
+            linear = np.where(normalized <= 0.03928, normalized / 12.92, np.power((normalized + 0.055) / 1.055, 2.4))
+        return 0.2126 * linear[:, 0] + 0.7152 * linear[:, 1] + 0.0722 * linear[:, 2]
+
+    def contrast_ratio(self, other: Union[str, Color, 'ColorArray']) -> np.ndarray:
+        """Get the WCAG 2 contrast ratio (1-21) between each color and another color, or the colors of another
+        collection of the same length. Alpha is ignored."""
+        if not isinstance(other, ColorArray):
+            other = ColorArray.from_colors([Color.parse(other)])
+        luminance, other_luminance = self.luminance, other.luminance
+        lighter, darker = np.maximum(luminance, other_luminance), np.minimum(luminance, other_luminance)
+        return (lighter + 0.05) / (darker + 0.05)
+
+    def get_contrast_text(self, alpha: float = 0.95) -> 'ColorArray':
+        """Get, for each color, a light or dark color that best contrasts it, for use with text.
+
+        Parameters
+        ----------
+        alpha : float
+            An alpha value to adjust the pure white / black by.
+
+        Returns
+        -------
+            ColorArray
+            Off-white or off-black colors, as returned by `Color.get_contrast_text`.
+        """
+        brightness = self.brightness
+        use_white = np.abs(brightness - WHITE.brightness) > np.abs(brightness - BLACK.brightness)
+        rgb = np.where(use_white[:, np.newaxis], WHITE.rgb, BLACK.rgb)
+        return ColorArray(rgb, np.full(len(self), alpha, dtype=np.float64))
+
+    @property
+    def hex(self) -> List[str]:
+        """The colors in CSS hex form, with 6 digits for RGB, and 8 digits for RGBA."""
+        return self._hex(include_alpha=True)
+
+    @property
+    def hex6(self) -> List[str]:
+        """The colors in CSS hex form, with 6 digits for RGB. Alpha is ignored."""
+        return self._hex(include_alpha=False)
+
+    @property
+    def css(self) -> List[str]:
+        """The colors in CSS rgb or rgba form."""
+        if len(self) and (self.rgb.min() < 0 or self.rgb.max() > 255):
+            # Components out of range are rare enough to fall back on the scalar implementation.
+            return self._format(lambda color: color.css)
+
+        opaque = self.alpha == 1
+        alphas, alpha_codes = np.unique(self.alpha, return_inverse=True)
+        alpha_chars, alpha_lengths = _ascii_table([f",{alpha}" for alpha in alphas.tolist()])
+        alpha_chars = np.where(opaque[:, np.newaxis], 0, alpha_chars[alpha_codes])
+        alpha_lengths = np.where(opaque, 0, alpha_lengths[alpha_codes])
+
+        red, green, blue = (_components_table(self.rgb[:, channel], _DECIMAL_TABLE) for channel in range(3))
+        prefix = (_ascii_table(['rgba(', 'rgb('])[0][opaque.astype(np.intp)], np.where(opaque, 4, 5))
+        return _concat_ascii([prefix, red, ',', green, ',', blue, (alpha_chars, alpha_lengths), ')'], len(self))
+
+    @property
+    def monochrome(self) -> 'ColorArray':
+        """Get alpha monochrome version of these colors."""
+        red, green, blue = self.rgb[:, 0], self.rgb[:, 1], self.rgb[:, 2]
+        gray = np.round(red * 0.2126 + green * 0.7152 + blue * 0.0722)
+        return ColorArray(np.repeat(gray[:, np.newaxis], 3, axis=1), self.alpha)
+
+    def with_alpha(self, alpha: Union[float, np.ndarray]) -> 'ColorArray':
+        """Create new colors with the given alpha."""
+        return ColorArray(self.rgb, alpha)
+
+    def blend(self, other: Union[str, Color, 'ColorArray'], factor: Union[float, np.ndarray],
+              alpha: Optional[float] = None) -> 'ColorArray':
+        """Generate new colors between these colors and other ones.
+
+        Parameters
+        ----------
+        other : Union[str, Color, ColorArray]
+            Another color, or a collection of colors of the same length.
+        factor : Union[float, np.ndarray]
+            A blend factor, or an array of blend factors, between 0 and 1.
+        alpha : Optional[float]
+            New alpha for results.
+
+        Returns
+        -------
+            ColorArray
+            New colors.
+        """
+        if not isinstance(other, ColorArray):
+            other = ColorArray.from_colors([Color.parse(other)])
+        factor = np.asarray(factor, dtype=np.float64)
+        size = max(len(self), len(other), factor.size)
+        factor = np.broadcast_to(factor, (size,))
+        rgb1, rgb2 = np.broadcast_to(self.rgb, (size, 3)), np.broadcast_to(other.rgb, (size, 3))
+        a1, a2 = np.broadcast_to(self.alpha, (size,)), np.broadcast_to(other.alpha, (size,))
+
+        rgb = (rgb1 + (rgb2 - rgb1) * factor[:, np.newaxis]).astype(np.int64)
+        new_alpha = a1 + (a2 - a1) * factor if alpha is None else np.full(size, alpha, dtype=np.float64)
+
+        # Mimic the shortcuts of Color.blend
+        is_self, is_other = factor == 0, factor == 1
+        rgb[is_self], new_alpha[is_self] = rgb1[is_self], a1[is_self]
+        rgb[is_other], new_alpha[is_other] = rgb2[is_other], a2[is_other]
+        return ColorArray(rgb, new_alpha)
+
+    def darken(self, amount: Union[float, np.ndarray], alpha: Optional[float] = None) -> 'ColorArray':
+        """Darken the colors by a given amount.
+
+        Parameters
+        ----------
+        amount : Union[float, np.ndarray]
+            Value, or array of values, between 0-1 to reduce luminance by.
+        alpha : Optional[alpha]
+            Alpha component for new colors or None to copy alpha. Defaults to None.
+
+        Returns
+        -------
+            ColorArray
+            New colors.
+        """
+        lab = self.lab
+        lab[:, 0] -= np.asarray(amount) * 100
+        return ColorArray.from_lab(lab, self.alpha if alpha is None else alpha).clamped
+
+    def lighten(self, amount: Union[float, np.ndarray], alpha: Optional[float] = None) -> 'ColorArray':
+        """Lighten the colors by a given amount."""
+        return self.darken(-np.asarray(amount), alpha)
+
+
+class ColorSpace(str, Enum):
+    """Color spaces in which a ColorScale can interpolate."""
+    rgb = 'rgb'
+    lab = 'lab'
+
+
+class ColorScale:
+    """A continuous color scale, mapping numbers to CSS colors through a precomputed lookup table.
+
+    Colors of the table are interpolated between the stops once, at instantiation. Mapping a value is then a matter
+    of computing its index in the table, which avoids allocating a new Color per value as `Color.blend` does.
+
+    Examples :
+    scale = ColorScale(['white', 'red'], vmin=0, vmax=100)
+    scale(50)
+    scale.map(dataframe['value'])
+    """
+
+    def __init__(self,
+                 stops: Sequence[Union[str, Color, Tuple[float, Union[str, Color]]]],
+                 size: int = 256,
+                 space: Union[str, ColorSpace] = ColorSpace.rgb,
+                 vmin: float = 0.0,
+                 vmax: float = 1.0,
+                 nan_color: Union[str, Color] = 'transparent'):
+        """Instantiates a new color scale.
+
+        Parameters
+        ----------
+        stops :
+            Colors of the scale, in any format accepted by `Color.parse`. They are either given alone, in which case
+            they are evenly spaced, or as (position, color) pairs with positions between 0 and 1.
+        size :
+            Number of entries in the lookup table, e.g. 256 or 1024.
+        space :
+            Color space in which the colors are interpolated, `rgb` blends as `Color.blend` does while `lab` gives
+            perceptually uniform scales.
+        vmin :
+            Value mapped to the first stop. Lower values are clipped.
+        vmax :
+            Value mapped to the last stop. Higher values are clipped.
+        nan_color :
+            Color of missing values.
+        """
+        if len(stops) < 2:
+            raise ValueError(f"Expected at least 2 stops, got {len(stops)}.")
+        if size < 2:
+            raise ValueError(f"Expected a size of at least 2, got {size}.")
+        if vmin == vmax:
+            raise ValueError(f"vmin and vmax should be different, got {vmin}.")
+
+        pairs = [isinstance(stop, tuple) and not isinstance(stop, Color) for stop in stops]
+        if any(pairs) and not all(pairs):
+            raise ValueError(f"Stops should either all be colors or all be (position, color) pairs, got {stops}.")
+        if all(pairs):
+            if any(len(stop) != 2 for stop in stops):
+                raise ValueError(f"Expected (position, color) pairs, got {stops}.")
+            positions, colors = zip(*stops)
+        else:
+            positions, colors = np.linspace(0.0, 1.0, len(stops)), stops
+        positions = np.asarray(positions, dtype=np.float64)
+        if np.any(np.diff(positions) < 0) or positions[0] != 0 or positions[-1] != 1:
+            raise ValueError(f"Stops positions should be increasing from 0 to 1, got {positions.tolist()}.")
+
+        self.stops = ColorArray.parse(colors)
+        self.positions = positions
+        self.space = ColorSpace(space)
+        self.vmin = vmin
+        self.vmax = vmax
+        self.nan_color = Color.parse(nan_color).css
+        self.colors = self._interpolate(np.linspace(0.0, 1.0, size))
+        self._table = np.array([*self.colors.css, self.nan_color], dtype=object)
+
+    def _interpolate(self, values: np.ndarray) -> ColorArray:
+        """Interpolate the colors of the stops at the given positions (0-1)."""
+        segment = np.clip(np.searchsorted(self.positions, values, side='right') - 1, 0, len(self.positions) - 2)
+        start, end = self.positions[segment], self.positions[segment + 1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            factor = np.where(end > start, (values - start) / (end - start), 1.0)
+
+        first, last = self.stops[segment], self.stops[segment + 1]
+        if self.space == ColorSpace.rgb:
+            return first.blend(last, factor)
+
+        lab = first.lab + (last.lab - first.lab) * factor[:, np.newaxis]
+        alpha = first.alpha + (last.alpha - first.alpha) * factor
+        return ColorArray.from_lab(lab, alpha).clamped
+
+    def __len__(self) -> int:
+        return len(self.colors)
+
+    def _indices(self, values: np.ndarray) -> np.ndarray:
+        """Position of the values in the lookup table, missing values being mapped to the last entry."""
+        size = len(self.colors)
+        normalized = np.clip((values - self.vmin) / (self.vmax - self.vmin), 0.0, 1.0)
+        indices = np.full(normalized.shape, size, dtype=np.intp)
+        valid = ~np.isnan(normalized)
+        indices[valid] = (normalized[valid] * (size - 1) + 0.5).astype(np.intp)
+        return indices
+
+    def __call__(self, value: Optional[float]) -> str:
+        """Map a single value to its CSS color."""
+        if value is None or value != value:
+            return self.nan_color
+        size = len(self.colors)
+        normalized = _clamp((value - self.vmin) / (self.vmax - self.vmin), 0.0, 1.0)
+        return self._table[int(normalized * (size - 1) + 0.5)]
+
+    def map(self, values: Iterable[Optional[float]]) -> List[str]:
+        """Map a collection of values to their CSS colors. Missing values are mapped to `nan_color`."""
+        values = np.asarray(values, dtype=np.float64)
+        return self._table[self._indices(values.ravel())].tolist()
+
+
+class Palette(Sequence[Color]):
+    """A compact, immutable collection of colors packed in a buffer of 4 bytes per color (red, green, blue, alpha).
+
+    Colors are only instantiated when accessed, and the buffer can be exported to and created from bytes without
+    copy, e.g. to share a palette between processes. The alpha component is stored with a precision of 1/255, as in
+    the `#RRGGBBAA` format.
+
+    Examples :
+    palette = Palette.from_colors(['red', '#00FF0080', 'rgb(0,0,255)'])
+    palette[1]
+    palette.css
+    Palette.from_bytes(palette.to_bytes())
+    """
+
+    __slots__ = ('_data',)
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview, np.ndarray] = b''):
+        """Instantiates a new palette from its packed buffer, without copying it.
+
+        Parameters
+        ----------
+        data :
+            Buffer with 4 bytes per color, in red, green, blue and alpha (0-255) order.
+        """
+        if isinstance(data, np.ndarray):
+            data = data.astype(np.uint8, copy=False)
+        else:
+            data = np.frombuffer(data, dtype=np.uint8)
+        if data.size % 4:
+            raise ValueError(f"Expected 4 bytes per color, got a buffer of {data.size} bytes.")
+        self._data = data.reshape(-1, 4)
+
+    @classmethod
+    def from_colors(cls, colors: Iterable[Union[str, Color]]) -> 'Palette':
+        """Create a palette from colors in any of the formats accepted by `Color.parse`."""
+        return cls.from_color_array(ColorArray.parse(colors))
+
+    @classmethod
+    def from_color_array(cls, colors: ColorArray) -> 'Palette':
+        """Create a palette from a ColorArray. Components are clamped."""
+        colors = colors.clamped
+        data = np.empty((len(colors), 4), dtype=np.uint8)
+        data[:, :3] = colors.rgb
+        data[:, 3] = np.round(colors.alpha * 255)
+        return cls(data)
+
+    @classmethod
+    def from_bytes(cls, data: Union[bytes, bytearray, memoryview]) -> 'Palette':
+        """Create a palette from the bytes returned by `to_bytes`, without copying them."""
+        return cls(data)
+
+    def to_bytes(self) -> bytes:
+        """Returns the packed buffer of the palette."""
+        return self._data.tobytes()
+
+    def to_color_array(self) -> ColorArray:
+        """Returns the colors of the palette as a ColorArray."""
+        return ColorArray(self._data[:, :3], self._data[:, 3] / 255)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the packed buffer in bytes."""
+        return self._data.nbytes
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, item) -> Union[Color, 'Palette']:
+        if isinstance(item, (int, np.integer)):
+            red, green, blue, alpha = self._data[item].tolist()
+            return Color(red, green, blue, alpha / 255)
+        return Palette(self._data[item])
+
+    def __iter__(self) -> Iterator[Color]:
+        for red, green, blue, alpha in self._data.tolist():
+            yield Color(red, green, blue, alpha / 255)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Palette):
+            return np.array_equal(self._data, other._data)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.hex!r})"
+
+    @property
+    def hex(self) -> List[str]:
+        """The colors in CSS hex form, with 6 digits for RGB, and 8 digits for RGBA."""
+        return self.to_color_array().hex
+
+    @property
+    def hex6(self) -> List[str]:
+        """The colors in CSS hex form, with 6 digits for RGB. Alpha is ignored."""
+        return self.to_color_array().hex6
+
+    @property
+    def css(self) -> List[str]:
+        """The colors in CSS rgb or rgba form."""
+        return self.to_color_array().css
+
+    @property
+    def brightness(self) -> np.ndarray:
+        """Get the human perceptual brightness (0-1) of each color."""
+        return self.to_color_array().brightness
+
+    @property
+    def monochrome(self) -> 'Palette':
+        """Get alpha monochrome version of the palette."""
+        return Palette.from_color_array(self.to_color_array().monochrome)
+
+    @property
+    def inverse(self) -> 'Palette':
+        """The inverse of the palette."""
+        data = self._data.copy()
+        data[:, :3] = 255 - data[:, :3]
+        return Palette(data)
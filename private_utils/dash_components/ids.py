@@ -0,0 +1,123 @@
+from collections import defaultdict
+from itertools import count
+from threading import Lock, local
+from typing import Dict, Iterator, List, Optional
+from uuid import uuid4
+
+__all__ = ['IdStrategy', 'UuidIds', 'CounterIds', 'HierarchicalIds', 'generate_uuid', 'get_id_strategy',
+           'set_id_strategy']
+
+_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+def _base36(number: int) -> str:
+    """Short representation of a positive integer."""
+    digits = []
+    while True:
+        number, remainder = divmod(number, 36)
+        digits.append(_DIGITS[remainder])
+        if not number:
+            return ''.join(reversed(digits))
+
+
+class IdStrategy:
+    """Strategy generating the ids of the components created without one.
+
+    The scope is the id of the component under construction, if any, so that the ids of the children can be derived
+    from the one of their parent.
+    """
+
+    def __call__(self, scope: str = '') -> str:
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        """Start the generation over, e.g. before building a new application in the same process."""
+
+
+class UuidIds(IdStrategy):
+    """Random ids, unique across processes, but long and different in each worker."""
+
+    def __call__(self, scope: str = '') -> str:
+        return str(uuid4())
+
+
+class CounterIds(IdStrategy):
+    """Short ids from a single counter of the process, e.g. `main_page-1f`.
+
+    The ids are the same in all the workers as long as the components are created in the same order.
+    """
+
+    def __init__(self, prefix: str = 'id'):
+        self.prefix = prefix
+        self._counter: Iterator[int] = count()
+
+    def __call__(self, scope: str = '') -> str:
+        return f'{scope or self.prefix}-{_base36(next(self._counter))}'
+
+    def reset(self) -> None:
+        self._counter = count()
+
+
+class HierarchicalIds(IdStrategy):
+    """Short ids numbered within the scope of their parent, e.g. `main_page-0`, `main_page-0-2`.
+
+    The id of a component only depends on its position among the components created by its parent, so that adding a
+    component to a page doesn't change the ids of the other pages. The ids chosen by hand must not have the same form,
+    e.g. a prefix followed by a dash and a number.
+    """
+
+    def __init__(self, prefix: str = 'id'):
+        self.prefix = prefix
+        self._counters: Dict[str, Iterator[int]] = defaultdict(count)
+        self._lock = Lock()
+
+    def __call__(self, scope: str = '') -> str:
+        scope = scope or self.prefix
+        with self._lock:
+            counter = self._counters[scope]
+        return f'{scope}-{_base36(next(counter))}'
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+_id_strategy: IdStrategy = UuidIds()
+_construction = local()
+
+
+def get_id_strategy() -> IdStrategy:
+    """Returns the strategy used by `generate_uuid`."""
+    return _id_strategy
+
+
+def set_id_strategy(strategy: IdStrategy) -> None:
+    """Replace the strategy used by `generate_uuid`, before the components are created.
+
+    Examples :
+    set_id_strategy(HierarchicalIds())
+    """
+    global _id_strategy
+    _id_strategy = strategy
+
+
+def _construction_stack() -> List[str]:
+    """Ids of the components under construction in the current thread, the innermost last."""
+    stack = getattr(_construction, 'stack', None)
+    if stack is None:
+        stack = _construction.stack = []
+    return stack
+
+
+def generate_uuid(scope: Optional[str] = None) -> str:
+    """Generate unique id.
+
+    Parameters
+    ----------
+    scope :
+        Scope of the id. Defaults to the id of the component under construction, if any.
+    """
+    if scope is None:
+        stack = _construction_stack()
+        scope = stack[-1] if stack else ''
+    return _id_strategy(scope)
@@ -0,0 +1,213 @@
+from contextlib import contextmanager
+from functools import wraps
+from inspect import iscoroutinefunction
+from threading import Lock
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, Optional
+
+from dash.exceptions import PreventUpdate
+from flask import g, has_request_context
+
+__all__ = ['Histogram', 'CallbackStats', 'CallbackMetrics']
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class Histogram:
+    """Histogram of positive values with a bounded relative error, in the manner of HdrHistogram.
+
+    Values are counted in log-linear buckets: exact below `2 ** significant_bits` units, then each power of two is
+    split in `2 ** (significant_bits - 1)` buckets, e.g. a relative error below 1/16 with the default 5 bits. Recording
+    is O(1) and the memory is bounded by the range of the values, not their number.
+
+    Example :
+    latencies = Histogram(unit=1e-6)  # microseconds resolution
+    latencies.record(0.0123)
+    latencies.quantile(0.99)
+    """
+
+    def __init__(self, significant_bits: int = 5, unit: float = 1.0):
+        """Instantiates an empty histogram.
+
+        Parameters
+        ----------
+        significant_bits :
+            Number of bits kept from the values, the relative error being below 2 ** (1 - significant_bits).
+        unit :
+            Resolution of the values, e.g. 1e-6 for durations in seconds measured to the microsecond.
+        """
+        self.significant_bits = significant_bits
+        self.unit = unit
+        self._counts: Dict[int, int] = {}
+        self._lock = Lock()
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def _index(self, units: int) -> int:
+        bits = self.significant_bits
+        shift = units.bit_length() - bits
+        if shift <= 0:
+            return units
+        # the mantissa keeps its leading bit, hence half the sub buckets per power of two
+        half = 1 << (bits - 1)
+        return (1 << bits) + (shift - 1) * half + (units >> shift) - half
+
+    def _upper_bound(self, index: int) -> float:
+        """Returns the largest value counted in the bucket."""
+        bits = self.significant_bits
+        if index < 1 << bits:
+            return index * self.unit
+        half = 1 << (bits - 1)
+        shift, mantissa = divmod(index - (1 << bits), half)
+        shift += 1
+        return (((mantissa + half + 1) << shift) - 1) * self.unit
+
+    def record(self, value: float) -> None:
+        """Count a value, negative values being counted as 0."""
+        index = self._index(max(int(value / self.unit), 0))
+        with self._lock:
+            self._counts[index] = self._counts.get(index, 0) + 1
+            self.count += 1
+            self.sum += value
+            self.max = max(self.max, value)
+
+    def quantile(self, quantile: float) -> float:
+        """Returns an upper bound of the quantile (0-1) of the recorded values, 0 if there are none."""
+        with self._lock:
+            counts = sorted(self._counts.items())
+            total = self.count
+        rank = quantile * total
+        cumulated = 0
+        for index, count in counts:
+            cumulated += count
+            if cumulated >= rank:
+                return min(self._upper_bound(index), self.max)
+        return self.max
+
+
+class CallbackStats:
+    """Measures of the calls of a callback."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.duration = Histogram(unit=1e-6)
+        """Duration of the calls in seconds"""
+        self.request_bytes = Histogram()
+        """Size of the requests, only for the callbacks called by Dash"""
+        self.response_bytes = Histogram()
+        """Size of the responses, only for the callbacks called by Dash"""
+        self.prevented = 0
+        """Number of calls raising PreventUpdate"""
+        self.errors = 0
+        """Number of calls raising another exception"""
+
+
+def _callback_name(function: Callable) -> str:
+    return function.__qualname__.replace('.<locals>', '')
+
+
+def _escape(label: str) -> str:
+    return label.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class CallbackMetrics:
+    """Traces the calls of callbacks: their duration, the size of their requests and responses, the rate of
+    PreventUpdate and the number of errors. Exported in the Prometheus text format.
+
+    Example :
+    metrics = CallbackMetrics()
+    app.callback(Output(...), Input(...))(metrics.trace(function))
+    print(metrics.to_prometheus())
+    """
+
+    def __init__(self, prefix: str = 'dash_callback'):
+        self.prefix = prefix
+        self._stats: Dict[str, CallbackStats] = {}
+        self._lock = Lock()
+
+    def stats(self, name: str) -> CallbackStats:
+        """Returns the measures of the callback, created on the first call."""
+        stats = self._stats.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(name, CallbackStats(name))
+        return stats
+
+    def __iter__(self) -> Iterable[CallbackStats]:
+        return iter(list(self._stats.values()))
+
+    def trace(self, function: Callable, name: Optional[str] = None) -> Callable:
+        """Wrap the function of a callback so that its calls are measured.
+
+        The first traced function called during a request is the one the size of the request and response are
+        attributed to, see `record_payload`, so that sub-callbacks called by a traced callback only measure their
+        duration. Coroutine functions are wrapped by a coroutine function, measured until their result is awaited.
+        """
+        stats = self.stats(name or _callback_name(function))
+
+        if iscoroutinefunction(function):
+            @wraps(function)
+            async def traced_async(*args, **kwargs):
+                with self._measure(stats):
+                    return await function(*args, **kwargs)
+
+            return traced_async
+
+        @wraps(function)
+        def traced(*args, **kwargs):
+            with self._measure(stats):
+                return function(*args, **kwargs)
+
+        return traced
+
+    @contextmanager
+    def _measure(self, stats: CallbackStats):
+        """Measure the duration and the outcome of a call of the callback."""
+        if has_request_context() and 'traced_callback' not in g:
+            g.traced_callback = stats
+        start = perf_counter()
+        try:
+            yield
+        except PreventUpdate:
+            with self._lock:
+                stats.prevented += 1
+            raise
+        except Exception:
+            with self._lock:
+                stats.errors += 1
+            raise
+        finally:
+            stats.duration.record(perf_counter() - start)
+
+    @staticmethod
+    def record_payload(request_bytes: int, response_bytes: int) -> None:
+        """Attribute the size of the current request and response to the callback it called, if traced."""
+        stats = g.pop('traced_callback', None)
+        if stats is not None:
+            stats.request_bytes.record(request_bytes)
+            stats.response_bytes.record(response_bytes)
+
+    def to_prometheus(self) -> str:
+        """Returns the measures in the Prometheus text exposition format."""
+        lines: List[str] = []
+        summaries = (('duration_seconds', 'Duration of the callbacks', 'duration'),
+                     ('request_bytes', 'Size of the requests of the callbacks', 'request_bytes'),
+                     ('response_bytes', 'Size of the responses of the callbacks', 'response_bytes'))
+        for suffix, description, attribute in summaries:
+            name = f'{self.prefix}_{suffix}'
+            lines += [f'# HELP {name} {description}.', f'# TYPE {name} summary']
+            for stats in self:
+                histogram: Histogram = getattr(stats, attribute)
+                label = f'callback="{_escape(stats.name)}"'
+                lines += [f'{name}{{{label},quantile="{quantile}"}} {histogram.quantile(quantile):g}'
+                          for quantile in QUANTILES]
+                lines += [f'{name}_sum{{{label}}} {histogram.sum:g}', f'{name}_count{{{label}}} {histogram.count}']
+
+        counters = (('prevented_total', 'Number of callbacks raising PreventUpdate', 'prevented'),
+                    ('errors_total', 'Number of callbacks raising an exception', 'errors'))
+        for suffix, description, attribute in counters:
+            name = f'{self.prefix}_{suffix}'
+            lines += [f'# HELP {name} {description}.', f'# TYPE {name} counter']
+            lines += [f'{name}{{callback="{_escape(stats.name)}"}} {getattr(stats, attribute)}' for stats in self]
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,108 @@
+import json
+from threading import Lock
+from typing import (Any, Hashable, List, NamedTuple, Optional, Sequence, Tuple,
+                    Union)
+
+from dash import Patch
+
+__all__ = ['list_patch', 'records_patch', 'PatchMeter', 'PatchStats']
+
+# An operation of a Patch, e.g. {"operation":"Assign","location":[12,"col"],"params":{"value":1}}, is about as long as
+# this number of items of a list of numbers or of cells of a record.
+PATCH_OPERATION_COST = 4
+
+
+def list_patch(previous: Optional[list], current: list) -> Union[Patch, list]:
+    """Returns a Patch updating the previous value of a list property into the current one, e.g. the data of a
+    DataTable, or the current list when a Patch would not be smaller.
+
+    The items which differ are assigned and the additional items appended, hence a list whose items were inserted or
+    removed is returned whole.
+
+    Parameters
+    ----------
+    previous :
+        Value of the property in the browser.
+    current :
+        New value of the property.
+    """
+    if previous is None or len(current) < len(previous):
+        return current
+    changed = [position for position, (old, new) in enumerate(zip(previous, current)) if old != new]
+    if len(changed) * PATCH_OPERATION_COST > len(current):
+        return current
+
+    patch = Patch()
+    for position in changed:
+        patch[position] = current[position]
+    if len(current) > len(previous):
+        patch.extend(current[len(previous):])
+    return patch
+
+
+def records_patch(records: List[dict], cells: Sequence[Tuple[int, Hashable]]) -> Union[Patch, List[dict]]:
+    """Returns a Patch assigning the cells of the records, e.g. the data of a DataTable, or the records when a Patch
+    would not be smaller.
+
+    Parameters
+    ----------
+    records :
+        New value of the property, with the same rows at the same positions as in the browser.
+    cells :
+        Positions of the row and key of the updated cells.
+    """
+    if not records or len(cells) * PATCH_OPERATION_COST > len(records) * len(records[0]):
+        return records
+
+    patch = Patch()
+    for position, key in cells:
+        patch[position][key] = records[position][key]
+    return patch
+
+
+def _size(value: Any) -> int:
+    if isinstance(value, Patch):
+        value = value.to_plotly_json()
+    return len(json.dumps(value, separators=(',', ':'), default=str))
+
+
+class PatchStats(NamedTuple):
+    """Size of the partial updates sent by callbacks, against the values they replace."""
+
+    updates: int
+    """Number of measured updates, partial or not"""
+    bytes_sent: int
+    """JSON size of the updates sent"""
+    bytes_saved: int
+    """JSON size of the full values which were not sent, minus the size of the patches sent instead"""
+
+
+class PatchMeter:
+    """Measures the bytes saved by sending a Patch instead of the full value of a property.
+
+    Measuring serializes the full value, hence it is only done when enabled.
+
+    Example :
+    meter = PatchMeter(enabled=True)
+    return meter.record(list_patch(previous_records, records), records)
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = Lock()
+        self._updates = self._bytes_sent = self._bytes_saved = 0
+
+    def record(self, update: Union[Patch, Any], value: Any) -> Union[Patch, Any]:
+        """Measure the update of a property to the value, and returns the update."""
+        if self.enabled:
+            sent = _size(update)
+            saved = _size(value) - sent if isinstance(update, Patch) else 0
+            with self._lock:
+                self._updates += 1
+                self._bytes_sent += sent
+                self._bytes_saved += saved
+        return update
+
+    def stats(self) -> PatchStats:
+        """Returns the sizes of the measured updates."""
+        return PatchStats(self._updates, self._bytes_sent, self._bytes_saved)
@@ -1,9 +1,11 @@
 from enum import Enum
-from typing import Optional, Union
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
 
-from .color import Color
+from .cache import Cache, CacheInfo
+from .color import Color, ColorArray
 
-__all__ = ['Spacing', 'Sizing', 'Shadow', 'BootstrapColor', 'BootstrapTextColor', 'ClassName', 'Style', 'FontWeight']
+__all__ = ['Spacing', 'Sizing', 'Shadow', 'BootstrapColor', 'BootstrapTextColor', 'ClassName', 'Style', 'FrozenStyle',
+           'FontWeight', 'conditional_color_styles']
 
 
 class Spacing(str, Enum):
@@ -71,12 +73,35 @@ class BootstrapTextColor(str, Enum):
     white_50 = f'text-{BootstrapColor.white} bg-dark'
 
 
+def _join_class_names(class_name: str, args: tuple) -> 'ClassName':
+    """Join class names, dropping the duplicates while preserving their order."""
+    names = dict.fromkeys(' '.join((class_name, *args)).split())
+    return ClassName(' '.join(names))
+
+
+# Results of ClassName.apply, keyed on the class name and the applied args.
+_class_name_cache = Cache(maxsize=1024 * 4)
+
+
 class ClassName(str):
-    """Wrapper for main bootstrap class names"""
+    """Wrapper for main bootstrap class names.
+
+    Class names are memoized: applying the same args to the same class name returns the same instance, so that
+    identical chains rebuilt by every component are only computed once."""
 
     def apply(self, *args) -> 'ClassName':
-        """Apply args to the class name under construction."""
-        return ClassName(' '.join((self, *args)).strip())
+        """Apply args to the class name under construction. Duplicated class names are dropped."""
+        return _class_name_cache.get_or_compute((self, args), _join_class_names, self, args)
+
+    @staticmethod
+    def cache_info() -> CacheInfo:
+        """Statistics of the memoized class names."""
+        return _class_name_cache.cache_info()
+
+    @staticmethod
+    def cache_clear() -> None:
+        """Clear the memoized class names."""
+        _class_name_cache.clear()
 
     def center(self) -> 'ClassName':
         """Center most of the controls."""
@@ -112,16 +137,36 @@ class ClassName(str):
 # class Display(str, Enum):
 #     flex = 'flex'
 
+# Memoized camel cased css keywords, as the same few keywords are used over and over.
+_camel_cased_keys: Dict[str, str] = {}
+
+
 def _to_camel_case(key: str):
     """Transform css keywords  with dash between words into camel cased words."""
-    split = key.split('-')
-    camel_cased = (''.join(
-        [item if n == 0 else item.capitalize()
-         for n, item in enumerate(split)])
-    )
+    camel_cased = _camel_cased_keys.get(key)
+    if camel_cased is None:
+        split = key.split('-')
+        camel_cased = (''.join(
+            [item if n == 0 else item.capitalize()
+             for n, item in enumerate(split)])
+        )
+        _camel_cased_keys[key] = camel_cased
     return camel_cased
 
 
+def _freeze(value):
+    """Returns a hashable version of a value, converting nested dictionaries and lists."""
+    if isinstance(value, Mapping):
+        return frozenset((key, _freeze(item)) for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+# Frozen styles, so that identical styles share the same instance.
+_frozen_styles = Cache(maxsize=1024 * 4)
+
+
 class Style(dict):
     def apply(self, key, value):
         """Add the key value to the dictionary."""
@@ -129,6 +174,11 @@ class Style(dict):
         self[key] = value
         return self
 
+    def freeze(self) -> 'FrozenStyle':
+        """Returns an immutable and hashable copy of the style. Identical styles return the same instance."""
+        frozen = FrozenStyle(self)
+        return _frozen_styles.get_or_compute(frozen, lambda: frozen)
+
     def color(self, color: Union[str, Color]):
         """Apply color key."""
         if isinstance(color, str):
@@ -238,3 +288,69 @@ class Style(dict):
 
     def border_radius(self, value):
         raise NotImplementedError
+
+
+class FrozenStyle(Style):
+    """Immutable and hashable Style, which can be shared between components.
+
+    Methods of Style are still available, but they return a new frozen style instead of modifying it.
+
+    Example :
+    HEADER_STYLE = Style().background('whitesmoke').font_weight(FontWeight.bold).freeze()
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._hash = None
+
+    def apply(self, key, value) -> 'FrozenStyle':
+        """Returns a new frozen style with the key value added."""
+        return Style(self).apply(key, value).freeze()
+
+    def freeze(self) -> 'FrozenStyle':
+        return _frozen_styles.get_or_compute(self, lambda: self)
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(_freeze(self))
+        return self._hash
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError(f"'{type(self).__name__}' object is immutable")
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+
+def conditional_color_styles(conditions: Sequence[Dict[str, Any]],
+                             backgrounds: Sequence[Union[str, Color]],
+                             text_alpha: float = 0.95) -> List[Style]:
+    """Generate conditional styles, e.g. for the `style_data_conditional` of a DataTable, setting both the background
+    color and a contrasting text color. Text colors are computed for all the backgrounds at once.
+
+    Example :
+    conditional_color_styles([{'row_index': 0, 'column_id': 'value'}], ['darkblue'])
+
+    Parameters
+    ----------
+    conditions :
+        The `if` clause of each style.
+    backgrounds :
+        The background color of each style.
+    text_alpha :
+        An alpha value to adjust the pure white / black of the text by.
+
+    Returns
+    -------
+    One style per condition.
+    """
+    if len(conditions) != len(backgrounds):
+        raise ValueError(f"conditions and backgrounds should have the same length, "
+                         f"got {len(conditions)} and {len(backgrounds)}")
+    colors = ColorArray.parse(backgrounds)
+    texts = colors.get_contrast_text(text_alpha)
+    return [Style({'if': condition}).apply('background-color', background).apply('color', text)
+            for condition, background, text in zip(conditions, colors.css, texts.css)]
@@ -0,0 +1,151 @@
+import re
+from enum import Enum
+from hashlib import md5
+from threading import Lock
+from typing import Any, Collection, Dict, Mapping, Optional
+
+from dash.development.base_component import Component
+
+from .style import ClassName, Style
+
+__all__ = ['StyleSheet']
+
+# Properties for which React does not append `px` to numbers in inline styles
+_UNITLESS_PROPERTIES = frozenset((
+    'animationIterationCount', 'aspectRatio', 'borderImageOutset', 'borderImageSlice', 'borderImageWidth',
+    'columnCount', 'columns', 'fillOpacity', 'flex', 'flexGrow', 'flexShrink', 'floodOpacity', 'fontWeight',
+    'gridArea', 'gridColumn', 'gridColumnEnd', 'gridColumnStart', 'gridRow', 'gridRowEnd', 'gridRowStart',
+    'lineClamp', 'lineHeight', 'opacity', 'order', 'orphans', 'scale', 'stopOpacity', 'strokeDasharray',
+    'strokeDashoffset', 'strokeMiterlimit', 'strokeOpacity', 'strokeWidth', 'tabSize', 'widows', 'zIndex', 'zoom',
+))
+_RE_UPPER = re.compile(r'([A-Z])')
+# Characters which could escape a css declaration
+_UNSAFE_CHARACTERS = frozenset('{};<>\\')
+
+
+def _to_kebab_case(key: str) -> str:
+    """Transform camel cased style keys, as used by React, into css properties."""
+    if key.startswith('ms') and key[2:3].isupper():
+        # The only vendor prefix React expects in lower case
+        key = f'M{key[1:]}'
+    return _RE_UPPER.sub(r'-\1', key).lower()
+
+
+def _to_css_value(key: str, value: Any) -> Optional[str]:
+    """Returns the css value of an inline style value, or None if it can't be expressed safely in a stylesheet."""
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return str(value) if key in _UNITLESS_PROPERTIES or value == 0 else f'{value}px'
+    if isinstance(value, str) and not _UNSAFE_CHARACTERS.intersection(value):
+        return value
+    return None
+
+
+class StyleSheet:
+    """Compiler hoisting the inline Style of components into css classes of a generated stylesheet.
+
+    Each distinct style is assigned a class name derived from its content, so that the same layout compiled in
+    different processes produces the same stylesheet. Declarations are marked `!important` to keep the precedence
+    of inline styles over the other stylesheets.
+
+    Example :
+    style_sheet = StyleSheet()
+    layout = style_sheet.compile(layout)
+    style_sheet.css
+    """
+
+    def __init__(self, prefix: str = 'ds-'):
+        """Instantiates a new stylesheet.
+
+        Parameters
+        ----------
+        prefix :
+            Prefix of the generated class names.
+        """
+        self.prefix = prefix
+        self._rules: Dict[str, str] = {}
+        self._lock = Lock()
+        self._css: Optional[str] = None
+        self._etag: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def class_name(self, style: Mapping[str, Any]) -> Optional[str]:
+        """Register the style and returns its class name, or None if it can't be expressed as a css class."""
+        declarations = []
+        for key, value in style.items():
+            css_value = _to_css_value(key, value)
+            if css_value is None:
+                return None
+            declarations.append(f'{_to_kebab_case(key)}: {css_value} !important;')
+        if not declarations:
+            return None
+
+        body = ' '.join(declarations)
+        class_name = self.prefix + md5(body.encode()).hexdigest()[:10]
+        if class_name not in self._rules:
+            with self._lock:
+                self._rules[class_name] = f'.{class_name} {{ {body} }}'
+                self._css = self._etag = None
+        return class_name
+
+    def compile(self, layout, excluded_ids: Collection[str] = (), exclude_dict_ids: bool = False):
+        """Replace the inline Style of the components of the layout by class names, in place.
+
+        Only styles built with Style are hoisted, plain dictionaries are left untouched, as well as components which
+        don't accept a className.
+
+        Parameters
+        ----------
+        layout :
+            Dash component, or list of components, to compile.
+        excluded_ids :
+            Identifiers of the components whose style must stay inline, e.g. because it is updated by a callback.
+        exclude_dict_ids :
+            Keep the style inline for all the components with a pattern-matching (dictionary) identifier.
+
+        Returns
+        -------
+        The compiled layout.
+        """
+        roots = layout if isinstance(layout, (list, tuple)) else [layout]
+        for root in roots:
+            if not isinstance(root, Component):
+                continue
+            for component in (root, *root._traverse()):
+                self._compile_component(component, excluded_ids, exclude_dict_ids)
+        return layout
+
+    def _compile_component(self, component, excluded_ids: Collection[str], exclude_dict_ids: bool):
+        style = getattr(component, 'style', None)
+        if not isinstance(style, Style) or 'className' not in getattr(component, '_prop_names', ()):
+            return
+        component_id = getattr(component, 'id', None)
+        if exclude_dict_ids if isinstance(component_id, dict) else component_id in excluded_ids:
+            return
+
+        class_name = self.class_name(style)
+        if class_name is None:
+            return
+        current = getattr(component, 'className', None)
+        component.className = ClassName(current).apply(class_name) if current else class_name
+        del component.style
+
+    @property
+    def css(self) -> str:
+        """The content of the stylesheet."""
+        if self._css is None:
+            with self._lock:
+                self._css = '\n'.join(self._rules.values())
+        return self._css
+
+    @property
+    def etag(self) -> str:
+        """Hash of the content of the stylesheet, for http caching."""
+        if self._etag is None:
+            self._etag = md5(self.css.encode()).hexdigest()
+        return self._etag
@@ -0,0 +1,99 @@
+from dash import Input, Output, html
+
+from private_utils.dash_components import (DashApp, LayoutComponent,
+                                           LayoutWalker, Style)
+
+
+def _compiled_app(*outputs, **keywords):
+    app = DashApp(__name__, compile_styles=True)
+    app.callback(*outputs, Input('button', 'n_clicks'), **keywords)(lambda n_clicks: [None] * len(outputs))
+    layout = html.Div([html.Button(id='button'),
+                       html.Div(id='updated', style=Style().margin('1rem')),
+                       html.Div(id='static', style=Style().margin('1rem'))])
+    app.layout = layout
+    return layout.children
+
+
+def test_style_outputs_stay_inline():
+    _, updated, static = _compiled_app(Output('updated', 'style'))
+    assert updated.style == {'margin': '1rem'}
+    assert static.className.startswith('ds-') and not hasattr(static, 'style')
+
+
+def test_duplicate_style_outputs_stay_inline():
+    _, updated, static = _compiled_app(Output('updated', 'style', allow_duplicate=True), prevent_initial_call=True)
+    assert updated.style == {'margin': '1rem'}
+    assert static.className.startswith('ds-')
+
+
+def test_class_name_outputs_stay_inline():
+    _, updated, static = _compiled_app(Output('updated', 'className'), Output('static', 'children'))
+    assert updated.style == {'margin': '1rem'} and getattr(updated, 'className', None) is None
+    assert static.className.startswith('ds-')
+
+
+class _Page(LayoutComponent):
+    loads = []
+
+    def __init__(self, margin: str, component_id: str = None):
+        super().__init__(component_id=component_id)
+        self.margin = margin
+
+    def load(self):
+        self.loads.append(self.component_id)
+
+    def layout(self):
+        return html.Div(id=self.generate_id('content'), style=Style().margin(self.margin))
+
+
+def test_pages_are_compiled_in_their_own_stylesheet():
+    _Page.loads.clear()
+    app = DashApp(__name__, compile_styles=True)
+    app.register_page('/', _Page, margin='1rem')
+    app.register_page('/other', _Page, margin='2rem')
+    app.layout = html.Div(app.page_container())
+    client = app.server.test_client()
+
+    assert client.get('/_compiled-styles.css').status_code == 200
+    assert _Page.loads == []
+    css = client.get('/_compiled-styles.css?page=other').get_data(as_text=True)
+    assert _Page.loads == ['page_other'] and 'margin: 2rem' in css and '1rem' not in css
+    assert client.get('/_compiled-styles.css?page=missing').status_code == 404
+
+    link, layout = app.callback_map['page-content.children']['callback'].__wrapped__('/other')
+    assert link.href == '/_compiled-styles.css?page=other'
+    assert layout.className in css and _Page.loads == ['page_other']
+
+
+class _Card(LayoutComponent):
+    calls = 0
+
+    def layout(self):
+        _Card.calls += 1
+        return html.P('card')
+
+
+def test_layout_walker_memoizes_layout_components():
+    walker = LayoutWalker()
+    card = _Card()
+    layout = walker.walk(html.Div([card, html.Div([card])]))
+    assert [child.children for child in (layout.children[0], layout.children[1].children[0])] == ['card', 'card']
+    calls = _Card.calls
+    stats = walker.last_stats
+    assert stats.layout_calls == 1 and stats.memoized == 1
+
+    walker.walk(html.Div([card, layout]))
+    assert _Card.calls == calls and walker.last_stats.skipped >= 1
+    walker.clear()
+    walker.walk(html.Div([card]))
+    assert _Card.calls == calls + 1
+
+
+def test_layout_walker_resolves_deep_layouts():
+    layout = html.Div(id='leaf')
+    for _ in range(5000):
+        layout = html.Div(layout)
+    walked = LayoutWalker().walk(layout)
+    for _ in range(5000):
+        walked = walked.children
+    assert walked.id == 'leaf'
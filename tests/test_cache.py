@@ -0,0 +1,78 @@
+import pytest
+
+from private_utils.dash_components import Cache, fingerprint
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = Cache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert 'b' not in cache and cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.cache_info() == (3, 0, 2, 2, 1, 0)
+
+
+def test_entries_expire_after_their_ttl():
+    clock = _Clock()
+    cache = Cache(ttl=10, timer=clock)
+    cache.set('a', 1)
+    clock.now = 9.9
+    assert cache.get('a') == 1
+    clock.now = 10
+    assert cache.get('a', 'missing') == 'missing'
+    info = cache.cache_info()
+    assert (info.hits, info.misses, info.currsize, info.expirations) == (1, 1, 0, 1)
+    assert info.hit_rate == 0.5
+
+
+def test_resize_evicts_the_oldest_entries():
+    cache = Cache(maxsize=None)
+    for key in range(5):
+        cache.set(key, key)
+    cache.resize(2)
+    assert len(cache) == 2 and 3 in cache and 4 in cache
+    assert cache.cache_info().evictions == 3
+    with pytest.raises(ValueError):
+        cache.resize(-1)
+    assert Cache(maxsize=0).get_or_compute('a', lambda: 1) == 1
+
+
+def test_clear_resets_the_statistics():
+    cache = Cache()
+    cache.get_or_compute('a', lambda: 1)
+    cache.clear()
+    assert cache.cache_info() == (0, 0, 128, 0, 0, 0)
+    assert cache.metrics('layout')['layout_hit_rate'] == 0.0
+
+
+def test_decorated_functions_are_called_once_per_arguments():
+    cache = Cache(maxsize=8)
+    calls = []
+
+    @cache
+    def square(value, offset=0):
+        calls.append(value)
+        return value * value + offset
+
+    assert [square(3), square(3), square(3, offset=1), square(4)] == [9, 9, 10, 16]
+    assert calls == [3, 3, 4]
+    assert square.cache_info().hits == 1
+    square.cache_clear()
+    assert len(cache) == 0
+
+
+def test_fingerprint_ignores_the_order_of_keys():
+    assert fingerprint({'a': 1, 'b': [1, 2]}) == fingerprint({'b': [1, 2], 'a': 1})
+    assert fingerprint({'a': 1}) != fingerprint({'a': 2})
+    assert fingerprint([1], 2) != fingerprint([1, 2])
+    # keys of different types can't be sorted
+    assert fingerprint({1: 'a', 'b': 2}) == fingerprint({1: 'a', 'b': 2})
@@ -0,0 +1,96 @@
+import json
+
+from dash import Dash, Input, Output, State, dcc, html
+
+from private_utils.dash_components import CallbackDispatcher
+
+
+def _size(value) -> int:
+    return len(json.dumps(value, separators=(',', ':')))
+
+
+def _app():
+    app = Dash(__name__)
+    app.layout = html.Div([html.Button(id='add'), html.Button(id='clear'), dcc.Store(id='records', data=[]),
+                           html.Div('initial', id='text'), html.Div(id='count')])
+    return app
+
+
+def _post(app, callback_id: str, values: dict, triggered: list):
+    """Call a registered callback through Dash, with the values of its inputs and states by `id.prop`."""
+    callback = next(callback for callback in app._callback_list if callback['output'] == callback_id)
+    arguments = {key: [{**dependency, 'value': values[f"{dependency['id']}.{dependency['property']}"]}
+                       for dependency in callback[key]] for key in ('inputs', 'state')}
+    outputs = [{'id': output.rpartition('.')[0], 'property': output.rpartition('.')[2].partition('@')[0]}
+               for output in callback_id.strip('.').split('...')]
+    body = {'output': callback_id, 'outputs': outputs if len(outputs) > 1 else outputs[0], **arguments,
+            'changedPropIds': triggered}
+    return app.server.test_client().post('/_dash-update-component', json=body)
+
+
+def _split_dispatcher(app) -> CallbackDispatcher:
+    with CallbackDispatcher(app, split=True, measure=True) as dispatcher:
+        @dispatcher.callback(Output('text', 'children'), Output('count', 'children'),
+                             Input('add', 'n_clicks'), State('records', 'data'))
+        def add(n_clicks, records):
+            return f'{len(records) + 1} records', len(records) + 1
+
+        @dispatcher.callback(Output('text', 'children'), Input('clear', 'n_clicks'))
+        def clear(n_clicks):
+            return 'cleared'
+
+        @dispatcher.callback(Output('count', 'children'), Input('clear', 'n_clicks'))
+        def reset(n_clicks):
+            return 0
+
+    return dispatcher
+
+
+def test_split_groups_share_outputs_as_duplicates():
+    app = _app()
+    _split_dispatcher(app)
+    assert len(app._callback_list) == 2
+    for callback in app._callback_list:
+        # shared outputs can't be set by the initial call, which would overwrite the values of the layout
+        assert '@' in callback['output'] and callback['prevent_initial_call']
+        assert _post(app, callback['output'], {'add.n_clicks': None, 'records.data': [], 'clear.n_clicks': None},
+                     []).status_code == 204
+
+
+def test_split_groups_only_upload_their_arguments():
+    app = _app()
+    dispatcher = _split_dispatcher(app)
+    add_id, clear_id = (callback['output'] for callback in app._callback_list)
+    records = [{'value': position} for position in range(100)]
+
+    response = _post(app, add_id, {'add.n_clicks': 1, 'records.data': records}, ['add.n_clicks'])
+    assert list(response.get_json()['response'].values()) == [{'children': '101 records'}, {'children': 101}]
+    stats = dispatcher.payload_stats()
+    # the arguments of the clear group were never sent, hence their size is unknown
+    assert stats == (1, _size(1) + _size(records), 0)
+
+    response = _post(app, clear_id, {'clear.n_clicks': 1}, ['clear.n_clicks'])
+    assert list(response.get_json()['response'].values()) == [{'children': 'cleared'}, {'children': 0}]
+    stats = dispatcher.payload_stats()
+    assert stats == (2, 2 * _size(1) + _size(records), _size(1) + _size(records))
+
+
+def test_merged_callback_only_calls_the_triggered_properties():
+    app = _app()
+    calls = []
+    with CallbackDispatcher(app) as dispatcher:
+        @dispatcher.callback(Output('text', 'children'), Input('records', 'data'))
+        def on_data(records):
+            calls.append('data')
+            return 'data'
+
+        @dispatcher.callback(Output('text', 'children'), Input('records', 'modified_timestamp'))
+        def on_timestamp(timestamp):
+            calls.append('timestamp')
+            return 'timestamp'
+
+    (callback,) = app._callback_list
+    response = _post(app, callback['output'], {'records.data': [], 'records.modified_timestamp': 1},
+                     ['records.modified_timestamp'])
+    assert response.get_json()['response'] == {'text': {'children': 'timestamp'}}
+    assert calls == ['timestamp']
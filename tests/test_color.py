@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from private_utils.dash_components import Cache
+from private_utils.dash_components.color import (Color, ColorArray,
+                                                 ColorParseError, ColorScale,
+                                                 get_color_cache, lab_to_rgb,
+                                                 rgb_to_lab, set_color_cache)
+
+
+def test_color_scale_maps_values_to_stops():
+    scale = ColorScale(['red', 'blue'])
+    assert scale.map([0, 1, None]) == [scale(0), scale(1), scale(None)]
+    assert scale(0) == 'rgb(255,0,0)' and scale(1) == 'rgb(0,0,255)'
+    assert ColorScale([(0, 'red'), (1, 'blue')]).map([0, 0.5, 1]) == scale.map([0, 0.5, 1])
+
+
+@pytest.mark.parametrize('stops', [[(0, 'red'), 'blue'], ['red', (1, 'blue')], [(0, 'red', 1), (1, 'blue')]])
+def test_color_scale_rejects_malformed_stops(stops):
+    with pytest.raises(ValueError, match='pairs'):
+        ColorScale(stops)
+
+
+COLORS = ['red', '#0f0', '#00f8', '#123456', '#12345678', '#ABCDEF', 'rgb(1,2,3)', 'rgb(300, 0, 0)', 'rgba(1,2,3,0.5)',
+          'hsl(120, 50%, 50%)', 'transparent', 'darkblue', Color(10, 20, 30, 0.25)]
+
+
+def test_color_array_parses_as_color():
+    assert ColorArray.parse(COLORS).to_colors() == [Color.parse(color) for color in COLORS]
+
+
+def test_color_array_parse_bypasses_the_color_cache():
+    cache = Cache()
+    previous = get_color_cache()
+    set_color_cache(cache)
+    try:
+        ColorArray.parse([f'#{value:06x}' for value in range(1000)])
+    finally:
+        set_color_cache(previous)
+    assert len(cache) == 0
+
+
+def test_color_array_parse_rejects_invalid_colors():
+    with pytest.raises(ColorParseError):
+        ColorArray.parse(['red', 'not a color'])
+
+
+def test_color_array_transformations_match_color():
+    # the alpha of `transparent` is the integer 0, formatted as such by Color only
+    colors = [Color.parse(color) for color in COLORS if color != 'transparent']
+    array = ColorArray.from_colors(colors)
+    assert array.css == [color.css for color in colors]
+    assert array.hex == [color.hex for color in colors]
+    assert array.darken(0.2).to_colors() == [color.darken(0.2) for color in colors]
+    assert array.lighten(0.3).to_colors() == [color.lighten(0.3) for color in colors]
+    assert array.get_contrast_text().to_colors() == [color.get_contrast_text() for color in colors]
+    assert array.blend('white', 0.5).to_colors() == [color.blend(Color.parse('white'), 0.5) for color in colors]
+    assert np.allclose(array.luminance, [color.luminance for color in colors])
+
+
+def test_lab_color_scale_matches_scalar_conversions():
+    scale = ColorScale(['black', 'white'], space='lab', size=3)
+    black, white = rgb_to_lab(Color.parse('black')), rgb_to_lab(Color.parse('white'))
+    middle = lab_to_rgb(black._replace(L=(black.L + white.L) / 2))
+    assert scale(0.5) == middle.clamped.css
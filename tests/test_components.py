@@ -0,0 +1,61 @@
+import random
+
+import pytest
+from components import ColumnTotals, TableWithControls
+
+from private_utils.dash_components import DashApp
+
+
+def test_load_file_keeps_text_columns(tmp_path):
+    file_path = tmp_path / 'table.csv'
+    file_path.write_text('name,price,label\nfirst,,a\nsecond,41.5,b\n')
+    table = TableWithControls.from_file_path(DashApp(__name__), 'table', str(file_path), include_total=True,
+                                             read_records=False)
+    name_id, price_id, label_id = table.columns_order.data
+    assert table.table.data == [{name_id: 'Total', price_id: 0, label_id: 0}]
+
+    table.load_file(str(file_path))
+    first, second, total = table.table.data
+    assert second == {name_id: 'second', price_id: 41.5, label_id: 'b'}
+    assert total == {name_id: 'Total', price_id: 41.5, label_id: 0}
+
+
+def _edited(records, position, key, value):
+    records = [dict(record) for record in records]
+    records[position][key] = value
+    return records
+
+
+@pytest.mark.parametrize('aggregate', ['sum', 'mean', 'min', 'max'])
+def test_incremental_totals_match_full_totals(aggregate):
+    generator = random.Random(0)
+    totals = ColumnTotals(index_id='name', total_label='Total', aggregate=aggregate)
+    records = totals.apply([{'name': str(position), 'price': round(generator.uniform(0, 100), 1),
+                             'quantity': generator.randint(0, 9)} for position in range(200)], ['price', 'quantity'])
+    for _ in range(300):
+        previous = records
+        records = _edited(previous, generator.randrange(200), generator.choice(['price', 'quantity']),
+                          round(generator.uniform(0, 100), 1))
+        records = totals.apply(records, ['price', 'quantity'], previous)
+        expected = totals.apply([dict(record) for record in records[:-1]], ['price', 'quantity'])[-1]
+        assert records[-1] == expected
+
+
+def test_incremental_sums_do_not_drift():
+    totals = ColumnTotals(index_id='name', total_label='Total')
+    records = totals.apply([{'name': 'a', 'price': 0.1}, {'name': 'b', 'price': 0.2}], ['price'])
+    assert records[-1]['price'] == 0.3
+    for value in [0.7, 0.3, 0.1] * 100:
+        records = totals.apply(_edited(records, 0, 'price', value), ['price'], records)
+    assert records[-1]['price'] == 0.3
+
+
+def test_totals_handle_moved_rows_and_invalid_cells():
+    totals = ColumnTotals(index_id='name', total_label='Total')
+    records = totals.apply([{'name': 'a', 'price': 'text'}, {'name': 'b', 'price': None}, {'name': 'c'}], ['price'])
+    assert records[-1] == {'name': 'Total', 'price': 0}
+    moved = [records[-1], *records[:-1]]
+    assert totals.apply(moved, ['price'], records)[-1] == {'name': 'Total', 'price': 0}
+    assert totals.apply([], ['price']) == [{'name': 'Total', 'price': 0}]
+    with pytest.raises(ValueError):
+        ColumnTotals(index_id='name', total_label='Total', aggregate='median')
@@ -0,0 +1,44 @@
+from uuid import UUID
+
+from private_utils.dash_components import (HierarchicalIds, LayoutComponent,
+                                           UuidIds, generate_uuid,
+                                           get_id_strategy, set_id_strategy)
+
+
+def test_default_ids_are_uuids():
+    assert isinstance(get_id_strategy(), UuidIds)
+    assert UUID(generate_uuid())
+
+
+def test_hierarchical_ids_are_numbered_by_scope():
+    ids = HierarchicalIds()
+    assert [ids(), ids('page'), ids('page'), ids()] == ['id-0', 'page-0', 'page-1', 'id-1']
+    ids.reset()
+    assert ids('page') == 'page-0'
+
+
+class _Parent(LayoutComponent):
+    def __init__(self, component_id=None):
+        super().__init__(component_id=component_id)
+        self.child = _Child()
+        self.other = generate_uuid()
+
+
+class _Child(LayoutComponent):
+    def __init__(self):
+        super().__init__()
+        self.grandchild = generate_uuid()
+
+    def layout(self):
+        return None
+
+
+def test_hierarchical_ids_are_scoped_by_the_component_under_construction():
+    previous = get_id_strategy()
+    set_id_strategy(HierarchicalIds())
+    try:
+        parent = _Parent('page')
+        assert (parent.child.component_id, parent.child.grandchild, parent.other) == ('page-0', 'page-0-0', 'page-1')
+        assert _Parent().component_id == 'id-0'
+    finally:
+        set_id_strategy(previous)
@@ -0,0 +1,37 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from dash.exceptions import PreventUpdate
+
+from private_utils.dash_components import CallbackMetrics, Histogram
+
+
+def test_histogram_quantiles_are_upper_bounds():
+    histogram = Histogram()
+    for value in range(1, 1001):
+        histogram.record(value)
+    assert histogram.count == 1000 and histogram.max == 1000
+    assert 500 <= histogram.quantile(0.5) <= 500 * (1 + 1 / 16)
+    assert histogram.quantile(1) == 1000
+
+
+def test_trace_counts_prevented_and_errors_across_threads():
+    metrics = CallbackMetrics()
+
+    def callback(value):
+        if value % 2:
+            raise PreventUpdate
+        raise ValueError(value)
+
+    traced = metrics.trace(callback)
+
+    def call(value):
+        with pytest.raises((PreventUpdate, ValueError)):
+            traced(value)
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(call, range(2000)))
+    stats = metrics.stats('test_trace_counts_prevented_and_errors_across_threads.callback')
+    assert (stats.prevented, stats.errors, stats.duration.count) == (1000, 1000, 2000)
+    assert 'dash_callback_errors_total{callback="test_trace_counts_prevented_and_errors_across_threads.callback"} ' \
+           '1000' in metrics.to_prometheus()
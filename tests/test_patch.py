@@ -0,0 +1,44 @@
+from dash import Patch
+
+from private_utils.dash_components import PatchMeter, list_patch, records_patch
+
+
+def _operations(patch: Patch) -> list:
+    return [(operation['operation'], operation['location'], operation['params'])
+            for operation in patch.to_plotly_json()['operations']]
+
+
+def test_list_patch_assigns_changed_items_and_extends():
+    previous = list(range(20))
+    current = [*previous[:5], 50, *previous[6:], 20, 21]
+    assert _operations(list_patch(previous, current)) == [('Assign', [5], {'value': 50}),
+                                                          ('Extend', [], {'value': [20, 21]})]
+
+
+def test_list_patch_returns_the_list_when_smaller():
+    previous = list(range(8))
+    assert list_patch(None, previous) is previous
+    shorter = previous[:-1]
+    assert list_patch(previous, shorter) is shorter
+    changed = [value + 1 for value in previous]
+    assert list_patch(previous, changed) is changed
+
+
+def test_records_patch_assigns_the_cells():
+    records = [{'a': position, 'b': position, 'c': position, 'd': position} for position in range(10)]
+    assert _operations(records_patch(records, [(9, 'a')])) == [('Assign', [9, 'a'], {'value': 9})]
+    cells = [(position, key) for position in range(10) for key in 'ab']
+    assert records_patch(records, cells) is records
+    assert records_patch([], []) == []
+
+
+def test_patch_meter_measures_the_saved_bytes():
+    meter = PatchMeter(enabled=True)
+    previous = list(range(100))
+    current = [*previous[:-1], 1000]
+    update = list_patch(previous, current)
+    assert meter.record(update, current) is update
+    meter.record(current, current)
+    updates, sent, saved = meter.stats()
+    assert updates == 2 and 0 < saved < len(str(current))
+    assert PatchMeter().record(update, current) is update and PatchMeter().stats() == (0, 0, 0)
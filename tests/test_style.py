@@ -0,0 +1,14 @@
+import pytest
+
+from private_utils.dash_components import conditional_color_styles
+
+
+def test_conditional_color_styles_contrast_with_backgrounds():
+    dark, light = conditional_color_styles([{'row_index': 0}, {'row_index': 1}], ['#000080', 'white'])
+    assert dark['if'] == {'row_index': 0} and light['if'] == {'row_index': 1}
+    assert dark['color'] != light['color']
+
+
+def test_conditional_color_styles_rejects_mismatched_lengths():
+    with pytest.raises(ValueError, match='same length'):
+        conditional_color_styles([{'row_index': 0}], ['white', 'black'])